@@ -2,10 +2,465 @@
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import numpy as np
+import plotly.graph_objects as go
+from plotly.colors import sequential
 from sqlalchemy.orm import Session
-from models import User, Feedback, SearchedGame, ChatHistory
-from sqlalchemy import func
+from sqlalchemy.engine import Connection
+from models import User, Feedback, SearchedGame, ChatHistory, refresh_materialized_views
+from sqlalchemy import func, text, case, select
+from collections import Counter
+import functools
+
+# Aggregate query results are cached for this many seconds
+CACHE_TTL_SECONDS = 300
+
+# Headline row counts are cached for a shorter time
+COUNT_CACHE_TTL_SECONDS = 60
+
+# The top-N materialized views are refreshed at most this often
+VIEW_REFRESH_SECONDS = 3600
+
+# Built Plotly figures kept per chart, keyed by the data they were built from
+FIGURE_CACHE_ENTRIES = 8
+
+# Subcategories beyond this many are grouped as 'Other'
+SUBCATEGORY_TOP_N = 10
+
+# Age histogram range and bin count, binned server-side with width_bucket
+AGE_HISTOGRAM_MIN = 0
+AGE_HISTOGRAM_MAX = 120
+AGE_HISTOGRAM_BINS = 20
+
+# Per-helper call and miss counters, reported by cache_stats()
+_cache_calls = Counter()
+_cache_misses = Counter()
+
+def _cached_query(query_fn=None, *, ttl=CACHE_TTL_SECONDS):
+    """
+    Wraps an aggregate query helper in st.cache_data and counts calls and cache misses.
+    Can be used bare or as `@_cached_query(ttl=...)`.
+
+    The helper's connection argument must be named with a leading underscore so Streamlit
+    does not try to hash it.
+    """
+    if query_fn is None:
+        return functools.partial(_cached_query, ttl=ttl)
+
+    name = query_fn.__name__
+
+    @functools.wraps(query_fn)
+    def run_query(*args, **kwargs):
+        _cache_misses[name] += 1
+        return query_fn(*args, **kwargs)
+
+    cached = st.cache_data(ttl=ttl, show_spinner=False)(run_query)
+
+    @functools.wraps(query_fn)
+    def wrapper(*args, **kwargs):
+        _cache_calls[name] += 1
+        return cached(*args, **kwargs)
+
+    wrapper.clear = cached.clear
+    return wrapper
+
+def cache_stats():
+    """
+    Returns the call, hit and miss counts of every cached aggregate query in this process.
+
+    Returns:
+        pd.DataFrame: One row per query helper.
+    """
+    rows = [
+        (name, calls, calls - _cache_misses[name], _cache_misses[name])
+        for name, calls in sorted(_cache_calls.items())
+    ]
+    return pd.DataFrame(rows, columns=["Query", "Calls", "Hits", "Misses"])
+
+def _to_frame(rows, columns):
+    """
+    Builds a DataFrame from query result rows whose last column is a count,
+    giving that column an explicit int64 dtype instead of inferring it row by row.
+    """
+    frame = pd.DataFrame.from_records(rows, columns=columns, coerce_float=False)
+    return frame.astype({columns[-1]: "int64"})
+
+def _to_columns(rows, columns):
+    """
+    Splits a handful of query result rows into a dict of lists, which Plotly accepts
+    directly, for small pie/bar aggregates where building a DataFrame costs more than the data.
+    """
+    values = list(zip(*rows)) if rows else [()] * len(columns)
+    return {column: list(column_values) for column, column_values in zip(columns, values)}
+
+def _monthly_count_stmt(table_name, time_column):
+    """
+    Builds the one parameterised per-month count statement shared by every monthly chart.
+    Identical SQL text per table lets SQLAlchemy's compiled cache reuse the statement;
+    psycopg2 sends plain queries, so Postgres still parses and plans each run.
+    """
+    return text(
+        f'SELECT date_trunc(\'month\', "{time_column}") AS "Month", count(*) AS "Count" '
+        f'FROM "{table_name}" GROUP BY 1 ORDER BY 1'
+    )
+
+# Cached aggregate queries
+
+@_cached_query(ttl=COUNT_CACHE_TTL_SECONDS)
+def _table_count(_conn, table_name):
+    # Plain Core statement: no ORM row processing, and count(*) lets Postgres pick the smallest index
+    return _conn.execute(text(f"SELECT count(*) FROM {table_name}")).scalar_one()
+
+@_cached_query(ttl=COUNT_CACHE_TTL_SECONDS)
+def fast_count(_conn, table_name):
+    """
+    Returns Postgres' planner estimate of the row count of `table_name` (pg_class.reltuples),
+    which is O(1) unlike count(*). Falls back to an exact count for tables never analyzed.
+    """
+    estimate = _conn.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE relname = :table_name"),
+        {"table_name": table_name}
+    ).scalar()
+    if estimate is None or estimate < 0:
+        return _table_count(_conn, table_name)
+    return int(estimate)
+
+@_cached_query
+def _monthly_counts(_conn, table_name, time_column, count_column):
+    # Month is parsed to datetime64 while pandas reads the rows
+    frame = pd.read_sql_query(_monthly_count_stmt(table_name, time_column), _conn, parse_dates=["Month"])
+    return frame.rename(columns={"Count": count_column}).astype({count_column: "int64"})
+
+@_cached_query
+def _gender_counts(_conn):
+    rows = _conn.execute(
+        select(User.gender, func.count(User.user_id)).group_by(User.gender)
+    ).all()
+    return _to_columns(rows, ["Gender", "Count"])
+
+@_cached_query
+def _age_buckets(_conn):
+    # Out-of-range ages fall into width_bucket's underflow/overflow buckets, so clamp them to the edge bins
+    stmt = text(
+        "SELECT GREATEST(LEAST(width_bucket(age, :lo, :hi, :bins), :bins), 1) AS bucket, count(*) "
+        "FROM users GROUP BY 1"
+    ).execution_options(yield_per=AGE_HISTOGRAM_BINS)
+    params = {"lo": AGE_HISTOGRAM_MIN, "hi": AGE_HISTOGRAM_MAX, "bins": AGE_HISTOGRAM_BINS}
+
+    # Stream the rows straight into a preallocated array; empty bins stay at zero
+    counts = np.zeros(AGE_HISTOGRAM_BINS, dtype=np.int64)
+    for bucket, count in _conn.execute(stmt, params):
+        counts[bucket - 1] = count
+
+    bucket_width = (AGE_HISTOGRAM_MAX - AGE_HISTOGRAM_MIN) / AGE_HISTOGRAM_BINS
+    midpoints = AGE_HISTOGRAM_MIN + (np.arange(AGE_HISTOGRAM_BINS) + 0.5) * bucket_width
+    return pd.DataFrame({"Age": midpoints, "Count": counts})
+
+@_cached_query
+def _feedback_type_counts(_conn):
+    rows = _conn.execute(
+        select(
+            Feedback.feedback_type, 
+            func.count(Feedback.feedback_id)
+        ).group_by(Feedback.feedback_type)
+    ).all()
+    return _to_columns(rows, ["Feedback Type", "Count"])
+
+@_cached_query
+def _top_upvoters(_conn):
+    rows = _conn.execute(text(
+        "SELECT user_name, upvote_count FROM mv_top_upvoters ORDER BY upvote_count DESC LIMIT 10"
+    )).all()
+    return _to_frame(rows, ["User Name", "Feedback Count"])
+
+@_cached_query
+def _top_searched_games(_conn):
+    rows = _conn.execute(text(
+        "SELECT game_name, search_count FROM mv_top_games ORDER BY search_count DESC LIMIT 10"
+    )).all()
+    return _to_frame(rows, ["Game Name", "Search Count"])
+
+@_cached_query
+def _games_by_category(_conn):
+    rows = _conn.execute(
+        select(
+            SearchedGame.category, 
+            func.count(SearchedGame.game_id)
+        ).group_by(SearchedGame.category)
+    ).all()
+    return _to_columns(rows, ["Category", "Count"])
+
+@_cached_query
+def _games_by_subcategory(_conn):
+    # Keep the top subcategories and collapse the long tail into 'Other' in SQL
+    rows = _conn.execute(
+        text("""
+            WITH counts AS (
+                SELECT subcategory, count(*) AS cnt
+                FROM searched_games
+                GROUP BY subcategory
+            )
+            SELECT CASE WHEN rn <= :top_n THEN subcategory ELSE 'Other' END AS subcategory, sum(cnt)
+            FROM (SELECT *, row_number() OVER (ORDER BY cnt DESC) AS rn FROM counts) ranked
+            GROUP BY 1
+        """),
+        {"top_n": SUBCATEGORY_TOP_N}
+    ).all()
+    return _to_columns(rows, ["Subcategory", "Count"])
+
+@_cached_query
+def _related_counts(_conn):
+    # Label rows in SQL so only the two label strings come back
+    related_label = func.coalesce(
+        case((ChatHistory.is_related, 'Related'), else_='Not Related'),
+        'Not Related'
+    ).label('related_label')
+    rows = _conn.execute(
+        select(
+            related_label, 
+            func.count(ChatHistory.chat_id)
+        ).group_by(related_label)
+    ).all()
+    return _to_columns(rows, ["Is Related", "Count"])
+
+@_cached_query
+def _top_questions(_conn):
+    rows = _conn.execute(text(
+        "SELECT question, ask_count FROM mv_top_questions ORDER BY ask_count DESC LIMIT 10"
+    )).all()
+    return _to_frame(rows, ["Question", "Count"])
+
+# Every aggregate shown on the dashboard, keyed by the name the *_analytics functions read
+_AGGREGATES = {
+    "gender_counts": _gender_counts,
+    "age_buckets": _age_buckets,
+    "new_users_by_month": functools.partial(
+        _monthly_counts, table_name=User.__tablename__,
+        time_column=User.registration_time.name, count_column="New Users"
+    ),
+    "feedback_type_counts": _feedback_type_counts,
+    "feedback_by_month": functools.partial(
+        _monthly_counts, table_name=Feedback.__tablename__,
+        time_column=Feedback.feedback_time.name, count_column="Feedback Count"
+    ),
+    "top_upvoters": _top_upvoters,
+    "top_searched_games": _top_searched_games,
+    "games_by_category": _games_by_category,
+    "games_by_subcategory": _games_by_subcategory,
+    "searches_by_month": functools.partial(
+        _monthly_counts, table_name=SearchedGame.__tablename__,
+        time_column=SearchedGame.searched_time.name, count_column="Search Count"
+    ),
+    "chats_by_month": functools.partial(
+        _monthly_counts, table_name=ChatHistory.__tablename__,
+        time_column=ChatHistory.timestamp.name, count_column="Chat Count"
+    ),
+    "related_counts": _related_counts,
+    "top_questions": _top_questions,
+}
+
+# Headline totals, keyed like _AGGREGATES, mapped to the table they count
+_TOTALS = {
+    "total_users": User.__tablename__,
+    "total_feedbacks": Feedback.__tablename__,
+    "total_searched_games": SearchedGame.__tablename__,
+    "total_chats": ChatHistory.__tablename__,
+}
+
+# Aggregates each dashboard section reads, so only the selected section is queried
+_SECTION_AGGREGATES = {
+    "User Analytics": ("total_users", "gender_counts", "age_buckets", "new_users_by_month"),
+    "Feedback Analytics": ("total_feedbacks", "feedback_type_counts", "feedback_by_month", "top_upvoters"),
+    "Game Analytics": (
+        "total_searched_games", "top_searched_games", "games_by_category",
+        "games_by_subcategory", "searches_by_month"
+    ),
+    "Chat History Analytics": ("total_chats", "chats_by_month", "related_counts", "top_questions"),
+    "Search Performance Metrics": (),
+}
+
+@st.cache_resource(ttl=VIEW_REFRESH_SECONDS, show_spinner=False)
+def _refresh_top_views(_engine):
+    # Runs on the first dashboard render and again once the TTL has expired.
+    # The dashboard's engine may stream results through named cursors, which only accept
+    # SELECTs, so the REFRESH statements run with streaming turned off.
+    refresh_materialized_views(_engine.execution_options(stream_results=False))
+    return True
+
+def precompute_all(conn: Connection, names=None, exact_counts=False):
+    """
+    Fetches dashboard aggregates over a single connection, so a render checks out one
+    pooled connection instead of one per query.
+
+    Args:
+        conn (Connection): SQLAlchemy connection every aggregate runs on.
+        names (iterable): Aggregates to fetch; all of them when None.
+        exact_counts (bool): Use count(*) for the headline totals instead of fast_count estimates.
+
+    Returns:
+        dict: Aggregate results keyed by name (see _AGGREGATES and _TOTALS).
+    """
+    count_fn = _table_count if exact_counts else fast_count
+    queries = dict(_AGGREGATES)
+    queries.update({
+        name: functools.partial(count_fn, table_name=table_name)
+        for name, table_name in _TOTALS.items()
+    })
+    if names is None:
+        names = queries
+    return {name: queries[name](conn) for name in names}
+
+# Figures are built directly with graph_objects, skipping plotly.express' per-call
+# DataFrame inference and validation.
+
+def _pie_figure(labels, values, colors, hole=0):
+    fig = go.Figure(go.Pie(
+        labels=labels,
+        values=values,
+        hole=hole,
+        marker=dict(colors=colors)
+    ))
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    return fig
+
+def _hbar_figure(labels, counts, colorscale, x_title, y_title):
+    fig = go.Figure(go.Bar(
+        x=counts,
+        y=labels,
+        orientation='h',
+        text=counts,
+        marker=dict(color=counts, colorscale=colorscale, showscale=True)
+    ))
+    fig.update_traces(texttemplate='%{text}', textposition='outside')
+    fig.update_layout(
+        xaxis=dict(title=x_title),
+        yaxis=dict(title=y_title),
+        showlegend=False,
+    )
+    return fig
+
+def _monthly_line_figure(months, counts, color, y_title):
+    fig = go.Figure(go.Scatter(
+        x=months,
+        y=counts,
+        mode='lines+markers',
+        line=dict(color=color)
+    ))
+    fig.update_layout(
+        xaxis=dict(
+            title='Month',
+            tickformat="%b %Y",
+            tickangle=-45
+        ),
+        yaxis=dict(title=y_title, tickprefix=""),
+    )
+    return fig
+
+# Cached figure builders: each Figure is rebuilt only when its input data changes
+
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_ENTRIES)
+def _fig_gender(gender_counts):
+    return _pie_figure(gender_counts['Gender'], gender_counts['Count'], sequential.Reds)
+
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_ENTRIES)
+def _fig_age(age_df):
+    fig_age = go.Figure(go.Bar(
+        x=age_df['Age'],
+        y=age_df['Count'],
+        marker=dict(color=sequential.Reds[0]),
+        opacity=0.95
+    ))
+    fig_age.update_layout(
+        xaxis_title="Age",
+        yaxis_title="Number of Users",
+        bargap=0.1
+    )
+    return fig_age
+
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_ENTRIES)
+def _fig_new_users(new_users_df):
+    return _monthly_line_figure(
+        new_users_df['Month'], new_users_df['New Users'], sequential.Reds[0], 'Number of New Users'
+    )
+
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_ENTRIES)
+def _fig_feedback_types(feedback_types):
+    return _pie_figure(feedback_types['Feedback Type'], feedback_types['Count'], sequential.Blues, hole=0.4)
+
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_ENTRIES)
+def _fig_feedback_time(feedback_over_time_df):
+    return _monthly_line_figure(
+        feedback_over_time_df['Month'], feedback_over_time_df['Feedback Count'],
+        sequential.Oranges[0], 'Number of Feedbacks'
+    )
+
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_ENTRIES)
+def _fig_feedback_user(feedback_per_user_df):
+    return _hbar_figure(
+        feedback_per_user_df['User Name'], feedback_per_user_df['Feedback Count'],
+        sequential.Viridis, 'Number of Upvotes', 'User Name'
+    )
+
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_ENTRIES)
+def _fig_top_games(top_games_df):
+    return _hbar_figure(
+        top_games_df['Game Name'], top_games_df['Search Count'],
+        sequential.Viridis, 'Number of Searches', 'Game Name'
+    )
+
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_ENTRIES)
+def _fig_category_pie(games_by_category):
+    return _pie_figure(games_by_category['Category'], games_by_category['Count'], sequential.Rainbow, hole=0.4)
+
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_ENTRIES)
+def _fig_category_bar(games_by_category):
+    return _hbar_figure(
+        games_by_category['Category'], games_by_category['Count'],
+        sequential.Rainbow, 'Number of Searches', 'Category'
+    )
+
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_ENTRIES)
+def _fig_subcategory_pie(games_by_subcategory):
+    return _pie_figure(games_by_subcategory['Subcategory'], games_by_subcategory['Count'], sequential.algae, hole=0.4)
+
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_ENTRIES)
+def _fig_subcategory_bar(games_by_subcategory):
+    return _hbar_figure(
+        games_by_subcategory['Subcategory'], games_by_subcategory['Count'],
+        sequential.Oranges, 'Number of Searches', 'Subcategory'
+    )
+
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_ENTRIES)
+def _fig_search_time(searches_over_time_df):
+    return _monthly_line_figure(
+        searches_over_time_df['Month'], searches_over_time_df['Search Count'],
+        sequential.Oranges[0], 'Number of Searches'
+    )
+
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_ENTRIES)
+def _fig_chats_time(chats_over_time_df):
+    return _monthly_line_figure(
+        chats_over_time_df['Month'], chats_over_time_df['Chat Count'],
+        sequential.Oranges[0], 'Number of Chats'
+    )
+
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_ENTRIES)
+def _fig_related_pie(related_counts):
+    return _pie_figure(related_counts['Is Related'], related_counts['Count'], sequential.Rainbow, hole=0.4)
+
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_ENTRIES)
+def _fig_related_bar(related_counts):
+    return _hbar_figure(
+        related_counts['Is Related'], related_counts['Count'],
+        sequential.Viridis, 'Number of Questions', 'Question Type'
+    )
+
+@st.cache_resource(show_spinner=False, max_entries=FIGURE_CACHE_ENTRIES)
+def _fig_common_questions(common_questions_df):
+    return _hbar_figure(
+        common_questions_df['Question'], common_questions_df['Count'],
+        sequential.Purples, 'Number of Times Asked', 'Question'
+    )
 
 def show_analytics(session: Session):
     """
@@ -15,486 +470,329 @@ def show_analytics(session: Session):
         session (Session): SQLAlchemy session connected to the PostgreSQL database.
     """
     st.title("📈 Comprehensive Analytics Dashboard")
+
+    # Headline totals are planner estimates unless exact counts are requested
+    exact_counts = st.toggle("Exact counts", value=False, help="Count every row for the Total metrics instead of using Postgres' estimate.")
     
-    # Create tabs for different analytics sections
-    tabs = st.tabs([
-        "User Analytics", 
-        "Feedback Analytics", 
-        "Game Analytics", 
-        "Chat History Analytics", 
-        "Search Performance Metrics"
-    ])
-    
-    with tabs[0]:
-        user_analytics(session)
-    
-    with tabs[1]:
-        feedback_analytics(session)
-    
-    with tabs[2]:
-        game_analytics(session)
-    
-    with tabs[3]:
-        chat_history_analytics(session)
-    
-    with tabs[4]:
+    # Only the selected section is rendered, so only its aggregates are queried
+    section = st.radio("Section", list(_SECTION_AGGREGATES), horizontal=True, label_visibility="collapsed")
+
+    if section == "Search Performance Metrics":
         search_performance_metrics(session)
+    else:
+        # Fetch the section's aggregates over the session's one connection before rendering
+        _refresh_top_views(session.get_bind())
+        data = precompute_all(
+            session.connection(), names=_SECTION_AGGREGATES[section], exact_counts=exact_counts
+        )
+        section_renderers = {
+            "User Analytics": user_analytics,
+            "Feedback Analytics": feedback_analytics,
+            "Game Analytics": game_analytics,
+            "Chat History Analytics": chat_history_analytics,
+        }
+        section_renderers[section](data)
 
-def user_analytics(session: Session):
+    with st.expander("Query cache statistics"):
+        st.dataframe(cache_stats(), use_container_width=True)
+
+def user_analytics(data: dict):
     """
     Displays user-related analytics including total users, gender distribution, age distribution,
     and new user registrations over time.
 
     Args:
-        session (Session): SQLAlchemy session.
+        data (dict): Aggregates returned by precompute_all.
     """
     st.header("👤 User Analytics")
     
     # Total Users
-    total_users = session.query(func.count(User.user_id)).scalar()
-    st.metric("Total Users", int(total_users))
+    total_users = data["total_users"]
+    st.metric("Total Users", total_users)
     
     # Users by Gender
     st.markdown("### Users by Gender")
-    gender_data = session.query(User.gender, func.count(User.user_id)).group_by(User.gender).all()
-    gender_df = pd.DataFrame(gender_data, columns=["Gender", "Count"])
-    
-    if not gender_df.empty:
-        fig_gender = px.pie(
-            gender_df, 
-            names='Gender', 
-            values='Count',
-            color='Gender',
-            color_discrete_sequence=px.colors.sequential.Reds
-        )
-        fig_gender.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig_gender, use_container_width=True)
+    gender_counts = data["gender_counts"]
+    
+    if gender_counts["Count"]:
+        st.plotly_chart(_fig_gender(gender_counts), use_container_width=True)
     else:
         st.info("No gender data available.")
     
     # Users by Age Distribution
     st.markdown("### Age Distribution of Users")
-    age_data = session.query(User.age).all()
-    age_df = pd.DataFrame(age_data, columns=["Age"])
-    
-    if not age_df.empty:
-        fig_age = px.histogram(
-            age_df, 
-            x='Age', 
-            nbins=20,
-            labels={'Age': 'Age'},
-            color_discrete_sequence=px.colors.sequential.Reds
-        )
-        fig_age.update_traces(opacity=0.95)
-        fig_age.update_layout(
-            xaxis_title="Age",
-            yaxis_title="Number of Users",
-            bargap=0.1
-        )
-        st.plotly_chart(fig_age, use_container_width=True)
+    age_df = data["age_buckets"]
+    
+    if age_df['Count'].sum() > 0:
+        st.plotly_chart(_fig_age(age_df), use_container_width=True)
     else:
         st.info("No age data available.")
     
     # New Users Over Time
     st.markdown("### New User Registrations Over Time")
-    new_users = session.query(
-        func.date_trunc('month', User.registration_time).label('month'),
-        func.count(User.user_id)
-    ).group_by('month').order_by('month').all()
-    new_users_df = pd.DataFrame(new_users, columns=["Month", "New Users"])
-    new_users_df['Month'] = pd.to_datetime(new_users_df['Month'])
+    new_users_df = data["new_users_by_month"]
     
     if not new_users_df.empty and new_users_df['New Users'].sum() > 0:
-        fig_new_users = px.line(
-            new_users_df, 
-            x='Month', 
-            y='New Users',
-            markers=True,
-            labels={'Month': 'Month', 'New Users': 'Number of New Users'},
-            color_discrete_sequence=px.colors.sequential.Reds
-        )
-        fig_new_users.update_layout(
-            xaxis=dict(
-                tickformat="%b %Y",
-                tickangle=-45
-            ),
-            yaxis=dict(tickprefix=""),
-        )
-        st.plotly_chart(fig_new_users, use_container_width=True)
+        st.plotly_chart(_fig_new_users(new_users_df), use_container_width=True)
     else:
         st.info("No new user registrations to display.")
 
-def feedback_analytics(session: Session):
+def feedback_analytics(data: dict):
     """
     Displays feedback-related analytics including total feedbacks, feedback type distribution,
     feedbacks over time, and feedback per user.
 
     Args:
-        session (Session): SQLAlchemy session.
+        data (dict): Aggregates returned by precompute_all.
     """
     st.header("📝 Feedback Analytics")
     
     # Total Feedbacks
-    total_feedbacks = session.query(func.count(Feedback.feedback_id)).scalar()
-    st.metric("Total Feedbacks", int(total_feedbacks))
+    total_feedbacks = data["total_feedbacks"]
+    st.metric("Total Feedbacks", total_feedbacks)
     
     # Feedback Types Distribution
     st.markdown("### Feedback Types Distribution")
-    feedback_types = session.query(
-        Feedback.feedback_type, 
-        func.count(Feedback.feedback_id)
-    ).group_by(Feedback.feedback_type).all()
-    feedback_types_df = pd.DataFrame(feedback_types, columns=["Feedback Type", "Count"])
-    
-    if not feedback_types_df.empty:
-        fig_feedback_types = px.pie(
-            feedback_types_df, 
-            names='Feedback Type', 
-            values='Count',
-            hole=0.4,
-            color='Feedback Type',
-            color_discrete_sequence=px.colors.sequential.Blues
-        )
-        fig_feedback_types.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig_feedback_types, use_container_width=True)
+    feedback_types = data["feedback_type_counts"]
+    
+    if feedback_types["Count"]:
+        st.plotly_chart(_fig_feedback_types(feedback_types), use_container_width=True)
     else:
         st.info("No feedback type data available.")
     
     # Feedbacks Over Time
     st.markdown("### Feedbacks Over Time")
-    feedback_over_time = session.query(
-        func.date_trunc('month', Feedback.feedback_time).label('month'),
-        func.count(Feedback.feedback_id)
-    ).group_by('month').order_by('month').all()
-    feedback_over_time_df = pd.DataFrame(feedback_over_time, columns=["Month", "Feedback Count"])
-    feedback_over_time_df['Month'] = pd.to_datetime(feedback_over_time_df['Month'])
+    feedback_over_time_df = data["feedback_by_month"]
     
     if not feedback_over_time_df.empty and feedback_over_time_df['Feedback Count'].sum() > 0:
-        fig_feedback_time = px.line(
-            feedback_over_time_df, 
-            x='Month', 
-            y='Feedback Count',
-            markers=True,
-            labels={'Month': 'Month', 'Feedback Count': 'Number of Feedbacks'},
-            color_discrete_sequence=px.colors.sequential.Oranges
-        )
-        fig_feedback_time.update_layout(
-            xaxis=dict(
-                tickformat="%b %Y",
-                tickangle=-45
-            ),
-            yaxis=dict(tickprefix=""),
-        )
-        st.plotly_chart(fig_feedback_time, use_container_width=True)
+        st.plotly_chart(_fig_feedback_time(feedback_over_time_df), use_container_width=True)
     else:
         st.info("No feedback data available.")
     
     # Feedback per User (Only Upvotes)
     st.markdown("### Top 10 Users by Upvote Feedback Count")
-    feedback_per_user = session.query(
-        User.user_name, 
-        func.count(Feedback.feedback_id).label('Feedback Count')
-    ).join(Feedback, User.user_id == Feedback.user_id)\
-     .filter(Feedback.feedback_type == 'up')\
-     .group_by(User.user_name)\
-     .order_by(func.count(Feedback.feedback_id).desc())\
-     .limit(10)\
-     .all()
-    
-    feedback_per_user_df = pd.DataFrame(feedback_per_user, columns=["User Name", "Feedback Count"])
+    feedback_per_user_df = data["top_upvoters"]
     
     if not feedback_per_user_df.empty:
-        fig_feedback_user = px.bar(
-            feedback_per_user_df, 
-            x='Feedback Count', 
-            y='User Name',
-            orientation='h',
-            text='Feedback Count',
-            color='Feedback Count',
-            color_continuous_scale=px.colors.sequential.Viridis
-        )
-        fig_feedback_user.update_traces(texttemplate='%{text}', textposition='outside')
-        fig_feedback_user.update_layout(
-            xaxis=dict(title='Number of Upvotes'),
-            yaxis=dict(title='User Name'),
-            showlegend=False,
-        )
-        st.plotly_chart(fig_feedback_user, use_container_width=True)
+        st.plotly_chart(_fig_feedback_user(feedback_per_user_df), use_container_width=True)
     else:
         st.info("No upvote feedback available.")
 
-def game_analytics(session: Session):
+def game_analytics(data: dict):
     """
     Displays game-related analytics including total searched games, top searched games,
     searched games by category and subcategory, and game searches over time.
 
     Args:
-        session (Session): SQLAlchemy session.
+        data (dict): Aggregates returned by precompute_all.
     """
     st.header("🎮 Game Analytics")
     
     # Total Searched Games
-    total_searched_games = session.query(func.count(SearchedGame.game_id)).scalar()
-    st.metric("Total Searched Games", int(total_searched_games))
+    total_searched_games = data["total_searched_games"]
+    st.metric("Total Searched Games", total_searched_games)
     
     # Top Searched Games
     st.markdown("### Top 10 Searched Games")
-    top_games = session.query(
-        SearchedGame.game_name, 
-        func.count(SearchedGame.game_id).label('Search Count')
-    ).group_by(SearchedGame.game_name)\
-     .order_by(func.count(SearchedGame.game_id).desc())\
-     .limit(10)\
-     .all()
-    top_games_df = pd.DataFrame(top_games, columns=["Game Name", "Search Count"])
+    top_games_df = data["top_searched_games"]
     
     if not top_games_df.empty:
-        fig_top_games = px.bar(
-            top_games_df, 
-            x='Search Count', 
-            y='Game Name',
-            orientation='h',
-            text='Search Count',
-            color='Search Count',
-            color_continuous_scale=px.colors.sequential.Viridis
-        )
-        fig_top_games.update_traces(texttemplate='%{text}', textposition='outside')
-        fig_top_games.update_layout(
-            xaxis=dict(title='Number of Searches'),
-            yaxis=dict(title='Game Name'),
-            showlegend=False,
-        )
-        st.plotly_chart(fig_top_games, use_container_width=True)
+        st.plotly_chart(_fig_top_games(top_games_df), use_container_width=True)
     else:
         st.info("No game search data available.")
     
     # Searched Games by Category
     st.markdown("### Searched Games by Category")
-    games_by_category = session.query(
-        SearchedGame.category, 
-        func.count(SearchedGame.game_id)
-    ).group_by(SearchedGame.category).all()
-    games_by_category_df = pd.DataFrame(games_by_category, columns=["Category", "Count"])
+    games_by_category = data["games_by_category"]
     
-    if not games_by_category_df.empty:
+    if games_by_category["Count"]:
         # Pie Chart
-        fig_category_pie = px.pie(
-            games_by_category_df, 
-            names='Category', 
-            values='Count',
-            hole=0.4,
-            color='Category',
-            color_discrete_sequence=px.colors.sequential.Rainbow
-        )
-        fig_category_pie.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig_category_pie, use_container_width=True)
+        st.plotly_chart(_fig_category_pie(games_by_category), use_container_width=True)
         
         # Bar Chart
-        fig_category_bar = px.bar(
-            games_by_category_df, 
-            x='Count', 
-            y='Category',
-            orientation='h',
-            text='Count',
-            color='Count',
-            color_continuous_scale=px.colors.sequential.Rainbow
-        )
-        fig_category_bar.update_traces(texttemplate='%{text}', textposition='outside')
-        fig_category_bar.update_layout(
-            xaxis=dict(title='Number of Searches'),
-            yaxis=dict(title='Category'),
-            showlegend=False,
-        )
-        st.plotly_chart(fig_category_bar, use_container_width=True)
+        st.plotly_chart(_fig_category_bar(games_by_category), use_container_width=True)
     else:
         st.info("No category-based game search data available.")
     
     # Searched Games by Subcategory
     st.markdown("### Searched Games by Subcategory")
-    games_by_subcategory = session.query(
-        SearchedGame.subcategory, 
-        func.count(SearchedGame.game_id)
-    ).group_by(SearchedGame.subcategory).all()
-    games_by_subcategory_df = pd.DataFrame(games_by_subcategory, columns=["Subcategory", "Count"])
+    games_by_subcategory = data["games_by_subcategory"]
     
-    if not games_by_subcategory_df.empty:
+    if games_by_subcategory["Count"]:
         # Pie Chart
-        fig_subcategory_pie = px.pie(
-            games_by_subcategory_df, 
-            names='Subcategory', 
-            values='Count',
-            hole=0.4,
-            color='Subcategory',
-            color_discrete_sequence=px.colors.sequential.algae
-        )
-        fig_subcategory_pie.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig_subcategory_pie, use_container_width=True)
+        st.plotly_chart(_fig_subcategory_pie(games_by_subcategory), use_container_width=True)
         
         # Bar Chart
-        fig_subcategory_bar = px.bar(
-            games_by_subcategory_df, 
-            x='Count', 
-            y='Subcategory',
-            orientation='h',
-            text='Count',
-            color='Count',
-            color_continuous_scale=px.colors.sequential.Oranges
-        )
-        fig_subcategory_bar.update_traces(texttemplate='%{text}', textposition='outside')
-        fig_subcategory_bar.update_layout(
-            xaxis=dict(title='Number of Searches'),
-            yaxis=dict(title='Subcategory'),
-            showlegend=False,
-        )
-        st.plotly_chart(fig_subcategory_bar, use_container_width=True)
+        st.plotly_chart(_fig_subcategory_bar(games_by_subcategory), use_container_width=True)
     else:
         st.info("No subcategory-based game search data available.")
     
     # Game Searches Over Time
     st.markdown("### Game Searches Over Time")
-    searches_over_time = session.query(
-        func.date_trunc('month', SearchedGame.searched_time).label('month'),
-        func.count(SearchedGame.game_id)
-    ).group_by('month').order_by('month').all()
-    searches_over_time_df = pd.DataFrame(searches_over_time, columns=["Month", "Search Count"])
-    searches_over_time_df['Month'] = pd.to_datetime(searches_over_time_df['Month'])
+    searches_over_time_df = data["searches_by_month"]
     
     if not searches_over_time_df.empty and searches_over_time_df['Search Count'].sum() > 0:
-        fig_search_time = px.line(
-            searches_over_time_df, 
-            x='Month', 
-            y='Search Count',
-            markers=True,
-            labels={'Month': 'Month', 'Search Count': 'Number of Searches'},
-            color_discrete_sequence=px.colors.sequential.Oranges
-        )
-        fig_search_time.update_layout(
-            xaxis=dict(
-                tickformat="%b %Y",
-                tickangle=-45
-            ),
-            yaxis=dict(tickprefix=""),
-        )
-        st.plotly_chart(fig_search_time, use_container_width=True)
+        st.plotly_chart(_fig_search_time(searches_over_time_df), use_container_width=True)
     else:
         st.info("No game search data available.")
 
-def chat_history_analytics(session: Session):
+def chat_history_analytics(data: dict):
     """
     Displays chat history-related analytics including total chats, chats over time,
     related vs. non-related questions, and most common questions.
 
     Args:
-        session (Session): SQLAlchemy session.
+        data (dict): Aggregates returned by precompute_all.
     """
     st.header("💬 Chat History Analytics")
     
     # Total Chats
-    total_chats = session.query(func.count(ChatHistory.chat_id)).scalar()
-    st.metric("Total Chats", int(total_chats))
+    total_chats = data["total_chats"]
+    st.metric("Total Chats", total_chats)
     
     # Chats Over Time
     st.markdown("### Chats Over Time")
-    chats_over_time = session.query(
-        func.date_trunc('month', ChatHistory.timestamp).label('month'),
-        func.count(ChatHistory.chat_id)
-    ).group_by('month').order_by('month').all()
-    chats_over_time_df = pd.DataFrame(chats_over_time, columns=["Month", "Chat Count"])
-    chats_over_time_df['Month'] = pd.to_datetime(chats_over_time_df['Month'])
+    chats_over_time_df = data["chats_by_month"]
     
     if not chats_over_time_df.empty and chats_over_time_df['Chat Count'].sum() > 0:
-        fig_chats_time = px.line(
-            chats_over_time_df, 
-            x='Month', 
-            y='Chat Count',
-            markers=True,
-            labels={'Month': 'Month', 'Chat Count': 'Number of Chats'},
-            color_discrete_sequence=px.colors.sequential.Oranges
-        )
-        fig_chats_time.update_layout(
-            xaxis=dict(
-                tickformat="%b %Y",
-                tickangle=-45
-            ),
-            yaxis=dict(tickprefix=""),
-        )
-        st.plotly_chart(fig_chats_time, use_container_width=True)
+        st.plotly_chart(_fig_chats_time(chats_over_time_df), use_container_width=True)
     else:
         st.info("No chat data available.")
     
     # Related vs. Non-related Questions
     st.markdown("### Related vs. Non-related Questions")
-    related_counts = session.query(
-        ChatHistory.is_related, 
-        func.count(ChatHistory.chat_id)
-    ).group_by(ChatHistory.is_related).all()
-    related_df = pd.DataFrame(related_counts, columns=["Is Related", "Count"])
-    related_df['Is Related'] = related_df['Is Related'].map({True: 'Related', False: 'Not Related'})
-    
-    if not related_df.empty:
+    related_counts = data["related_counts"]
+    
+    if related_counts["Count"]:
         # Pie Chart
-        fig_related_pie = px.pie(
-            related_df, 
-            names='Is Related', 
-            values='Count',
-            hole=0.4,
-            color='Is Related',
-            color_discrete_sequence=px.colors.sequential.Rainbow
-        )
-        fig_related_pie.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig_related_pie, use_container_width=True)
+        st.plotly_chart(_fig_related_pie(related_counts), use_container_width=True)
         
         # Bar Chart
-        fig_related_bar = px.bar(
-            related_df, 
-            x='Count', 
-            y='Is Related',
-            orientation='h',
-            text='Count',
-            color='Count',
-            color_continuous_scale=px.colors.sequential.Viridis
-        )
-        fig_related_bar.update_traces(texttemplate='%{text}', textposition='outside')
-        fig_related_bar.update_layout(
-            xaxis=dict(title='Number of Questions'),
-            yaxis=dict(title='Question Type'),
-            showlegend=False,
-        )
-        st.plotly_chart(fig_related_bar, use_container_width=True)
+        st.plotly_chart(_fig_related_bar(related_counts), use_container_width=True)
     else:
         st.info("No related/non-related question data available.")
     
     # Most Common Questions
     st.markdown("### Top 10 Most Common Questions")
-    common_questions = session.query(
-        ChatHistory.question, 
-        func.count(ChatHistory.chat_id).label('Count')
-    ).group_by(ChatHistory.question)\
-     .order_by(func.count(ChatHistory.chat_id).desc())\
-     .limit(10)\
-     .all()
-    common_questions_df = pd.DataFrame(common_questions, columns=["Question", "Count"])
+    common_questions_df = data["top_questions"]
     
     if not common_questions_df.empty:
-        fig_common_questions = px.bar(
-            common_questions_df, 
-            x='Count', 
-            y='Question',
-            orientation='h',
-            text='Count',
-            color='Count',
-            color_continuous_scale=px.colors.sequential.Purples
-        )
-        fig_common_questions.update_traces(texttemplate='%{text}', textposition='outside')
-        fig_common_questions.update_layout(
-            xaxis=dict(title='Number of Times Asked'),
-            yaxis=dict(title='Question'),
-            showlegend=False,
-        )
-        st.plotly_chart(fig_common_questions, use_container_width=True)
+        st.plotly_chart(_fig_common_questions(common_questions_df), use_container_width=True)
     else:
         st.info("No question data available.")
 
+# Search performance metrics are static, so the table and figures are built once at import
+
+SEARCH_METRICS = pd.DataFrame({
+    "Search Method": [
+        "Text Search with MINSEARCH",
+        "Text Search with Boosting",
+        "Vector Search with Weaviate",
+        "Hybrid Search",
+        "Document Reranking"
+    ],
+    "Hit Rate@10": [
+        0.5519,
+        0.8146,
+        0.9515,
+        0.9715,
+        0.9715
+    ],
+    "MRR@10": [
+        0.2861,
+        0.5880,
+        0.7799,
+        0.8177,
+        0.8146
+    ]
+})
+
+_HIT_RATES = SEARCH_METRICS["Hit Rate@10"]
+_MRRS = SEARCH_METRICS["MRR@10"]
+
+FIG_HIT = go.Figure(go.Bar(
+    x=SEARCH_METRICS["Search Method"],
+    y=_HIT_RATES,
+    text=_HIT_RATES,
+    texttemplate='%{text:.2%}',
+    textposition='inside',
+    marker=dict(color=_HIT_RATES, colorscale=sequential.Greens, showscale=True)
+))
+FIG_HIT.update_layout(
+    height=300,
+    uniformtext_minsize=8,
+    uniformtext_mode='hide',
+    xaxis_title="Search Method",
+    yaxis_title="Hit Rate@10",
+    showlegend=False
+)
+
+FIG_MRR = go.Figure(go.Bar(
+    x=SEARCH_METRICS["Search Method"],
+    y=_MRRS,
+    text=_MRRS,
+    texttemplate='%{text:.2%}',
+    textposition='inside',
+    marker=dict(color=_MRRS, colorscale=sequential.OrRd, showscale=True)
+))
+FIG_MRR.update_layout(
+    height=300,
+    uniformtext_minsize=8,
+    uniformtext_mode='hide',
+    xaxis_title="Search Method",
+    yaxis_title="MRR@10",
+    showlegend=False
+)
+
+# Bubble area scales with the hit rate, capped at 20px like plotly.express' default size_max
+FIG_COMBINED = go.Figure(go.Scatter(
+    x=_HIT_RATES,
+    y=_MRRS,
+    mode='markers+text',
+    text=SEARCH_METRICS["Search Method"],
+    textposition='top center',
+    marker=dict(
+        size=_HIT_RATES,
+        sizemode='area',
+        sizeref=2.0 * _HIT_RATES.max() / (20 ** 2),
+        color=_MRRS,
+        colorscale=sequential.Greens,
+        showscale=True
+    )
+))
+FIG_COMBINED.update_layout(
+    height=400,
+    showlegend=False,
+    xaxis=dict(
+        tickformat=".0%",
+        title="Hit Rate@10",
+        titlefont=dict(size=18)
+    ),
+    yaxis=dict(
+        tickformat=".0%",
+        title="MRR@10",
+        titlefont=dict(size=18)
+    )
+)
+
+BEST_METHODS = pd.concat([
+    SEARCH_METRICS.loc[SEARCH_METRICS["Hit Rate@10"] == SEARCH_METRICS["Hit Rate@10"].max()],
+    SEARCH_METRICS.loc[SEARCH_METRICS["MRR@10"] == SEARCH_METRICS["MRR@10"].max()]
+]).drop_duplicates()
+
+_TABLE_FORMAT = {
+    "Hit Rate@10": "{:.2%}", 
+    "MRR@10": "{:.2%}"
+}
+_TABLE_STYLES = [
+    {'selector': 'th', 'props': [('background-color', '#f2f2f2'), ('text-align', 'center'), ('font-size', '16px')]},
+    {'selector': 'td', 'props': [('text-align', 'center'), ('font-size', '14px')]}
+]
+
+# The metrics never change, so style them once instead of building a Styler per rerun
+_STYLED_HTML = SEARCH_METRICS.style.format(_TABLE_FORMAT).set_table_styles(_TABLE_STYLES).to_html()
+_BEST_HTML = BEST_METHODS.style.format(_TABLE_FORMAT).set_table_styles(_TABLE_STYLES).to_html()
+
 def search_performance_metrics(session: Session):
     """
     Displays search performance metrics including Hit Rate@10 and MRR@10 for various search methods.
@@ -503,138 +801,31 @@ def search_performance_metrics(session: Session):
         session (Session): SQLAlchemy session.
     """
     st.header("🔍 Search Performance Metrics")
-    
-    # Data Preparation
-    data = {
-        "Search Method": [
-            "Text Search with MINSEARCH",
-            "Text Search with Boosting",
-            "Vector Search with Weaviate",
-            "Hybrid Search",
-            "Document Reranking"
-        ],
-        "Hit Rate@10": [
-            0.5519,
-            0.8146,
-            0.9515,
-            0.9715,
-            0.9715
-        ],
-        "MRR@10": [
-            0.2861,
-            0.5880,
-            0.7799,
-            0.8177,
-            0.8146
-        ]
-    }
-
-    df = pd.DataFrame(data)
-
-    # Display the DataFrame with visible tables using st.dataframe for better styling
+
+    # Styled tables are rendered to HTML once at import
     st.markdown("### Key Metrics")
-    styled_table = df.style.format({
-        "Hit Rate@10": "{:.2%}", 
-        "MRR@10": "{:.2%}"
-    }).set_table_styles([
-        {'selector': 'th', 'props': [('background-color', '#f2f2f2'), ('text-align', 'center'), ('font-size', '16px')]},
-        {'selector': 'td', 'props': [('text-align', 'center'), ('font-size', '14px')]}
-    ])
-    st.dataframe(styled_table, use_container_width=True)
+    st.markdown(_STYLED_HTML, unsafe_allow_html=True)
     
     # Hit Rate Comparison
     st.markdown("### 📊 Hit Rate Comparison")
-    fig_hit = px.bar(
-        df,
-        x="Search Method",
-        y="Hit Rate@10",
-        text="Hit Rate@10",
-        color="Hit Rate@10",
-        color_continuous_scale=px.colors.sequential.Greens,
-        labels={"Hit Rate@10": "Hit Rate@10"},
-        height=300
-    )
-    fig_hit.update_traces(texttemplate='%{text:.2%}', textposition='inside')
-    fig_hit.update_layout(
-        uniformtext_minsize=8,
-        uniformtext_mode='hide',
-        xaxis_title="Search Method",
-        yaxis_title="Hit Rate@10",
-        showlegend=False
-    )
-    st.plotly_chart(fig_hit, use_container_width=True)
+    st.plotly_chart(FIG_HIT, use_container_width=True)
     
     # MRR Comparison
     st.markdown("### 📈 Mean Reciprocal Rank (MRR) Comparison")
-    fig_mrr = px.bar(
-        df,
-        x="Search Method",
-        y="MRR@10",
-        text="MRR@10",
-        color="MRR@10",
-        color_continuous_scale=px.colors.sequential.OrRd,
-        labels={"MRR@10": "MRR@10"},
-        height=300
-    )
-    fig_mrr.update_traces(texttemplate='%{text:.2%}', textposition='inside')
-    fig_mrr.update_layout(
-        uniformtext_minsize=8,
-        uniformtext_mode='hide',
-        xaxis_title="Search Method",
-        yaxis_title="MRR@10",
-        showlegend=False
-    )
-    st.plotly_chart(fig_mrr, use_container_width=True)
+    st.plotly_chart(FIG_MRR, use_container_width=True)
 
     # Combined Metrics
     st.markdown("### 📊 Combined Hit Rate and MRR")
-    fig_combined = px.scatter(
-        df,
-        x="Hit Rate@10",
-        y="MRR@10",
-        text="Search Method",
-        size="Hit Rate@10",
-        color="MRR@10",
-        color_continuous_scale=px.colors.sequential.Greens,
-        labels={"Hit Rate@10": "Hit Rate@10", "MRR@10": "MRR@10"},
-        height=400
-    )
-    fig_combined.update_traces(textposition='top center')
-    fig_combined.update_layout(
-        showlegend=False,
-        xaxis=dict(
-            tickformat=".0%",
-            title="Hit Rate@10",
-            titlefont=dict(size=18)
-        ),
-        yaxis=dict(
-            tickformat=".0%",
-            title="MRR@10",
-            titlefont=dict(size=18)
-        )
-    )
-    st.plotly_chart(fig_combined, use_container_width=True)
+    st.plotly_chart(FIG_COMBINED, use_container_width=True)
 
     # Highlight Best Performers
     st.markdown("### 🏆 Best Performing Search Methods")
-    best_hit_rate = df.loc[df["Hit Rate@10"] == df["Hit Rate@10"].max()]
-    best_mrr = df.loc[df["MRR@10"] == df["MRR@10"].max()]
-    best_methods = pd.concat([best_hit_rate, best_mrr]).drop_duplicates()
-    
-    if not best_methods.empty:
-        styled_best_methods = best_methods.style.format({
-            "Hit Rate@10": "{:.2%}", 
-            "MRR@10": "{:.2%}"
-        }).set_table_styles([
-            {'selector': 'th', 'props': [('background-color', '#f2f2f2'), ('text-align', 'center'), ('font-size', '16px')]},
-            {'selector': 'td', 'props': [('text-align', 'center'), ('font-size', '14px')]}
-        ])
-        st.dataframe(styled_best_methods, use_container_width=True)
+    if not BEST_METHODS.empty:
+        st.markdown(_BEST_HTML, unsafe_allow_html=True)
     else:
         st.info("No best performing search methods to display.")
     
     st.markdown("""
     ---
     *This dashboard provides an overview of the search performance metrics for the Game Finder project. The metrics include Hit Rate@10 and Mean Reciprocal Rank (MRR@10) for various search methods.*
-    """)
-
+    """)
\ No newline at end of file
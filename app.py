@@ -1,14 +1,18 @@
 import streamlit as st
 from rag_flow import get_answer
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from models import Base, User, Feedback, ChatHistory, SearchedGame
+from sqlalchemy import create_engine, func, insert, update, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker, scoped_session, joinedload
+from models import Base, User, Feedback, ChatHistory, MAX_QUESTIONS, QUESTION_CAP_CONSTRAINTS, upgrade_schema, create_missing_indexes, create_materialized_views
 import weaviate
 from datetime import datetime, timedelta
 import traceback
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 import analytics  # Import analytics.py
 import re  # Import regular expressions module for username validation
 from weaviate.auth import AuthApiKey
+from weaviate.config import Config, ConnectionConfig
 #from weaviate_setup import  create_schema, ingest_data
 from weaviate_setup import initialize_weaviate
 # ... other imports
@@ -26,10 +30,20 @@ st.set_page_config(
 # Session timeout settings
 SESSION_TIMEOUT_MINUTES = 15  # You can adjust the timeout duration here
 
+# Database writes that overlap with answer generation
+DB_EXECUTOR_WORKERS = 4
+
+# Usernames: only letters and numbers (compiled once, not on every rerun)
+_USERNAME_RE = re.compile(r"\A[A-Za-z0-9]+\Z")
+
 # Sidebar Navigation
 st.sidebar.title("Navigation")
 page = st.sidebar.radio("Go to", ["Welcome", "Ask Questions", "Analytics"])
 
+# Keep-alive connection pool shared by every session's vector searches
+WEAVIATE_POOL_CONNECTIONS = 8
+WEAVIATE_POOL_MAXSIZE = 32
+
 # Initialize Weaviate Client
 @st.cache_resource
 def init_weaviate_client():
@@ -40,10 +54,17 @@ def init_weaviate_client():
         # Create an instance of AuthApiKey with your API key
         auth_config = AuthApiKey(api_key=WEAVIATE_API_KEY)
         
-        # Initialize the Weaviate client with the auth_config
+        # Initialize the Weaviate client with the auth_config and a pooled HTTP session,
+        # so searches reuse open TLS connections instead of handshaking per question
         client = weaviate.Client(
             url=WEAVIATE_URL,
-            auth_client_secret=auth_config
+            auth_client_secret=auth_config,
+            additional_config=Config(
+                connection_config=ConnectionConfig(
+                    session_pool_connections=WEAVIATE_POOL_CONNECTIONS,
+                    session_pool_maxsize=WEAVIATE_POOL_MAXSIZE
+                )
+            )
         )
         if not client.is_ready():
             st.error(f"🚨 Cannot connect to Weaviate at {WEAVIATE_URL}. Please ensure it's running.")
@@ -55,6 +76,11 @@ def init_weaviate_client():
 
 client = init_weaviate_client()
 
+# Connection pool shared by every session's script thread and the DB executor
+DB_POOL_SIZE = 10
+DB_MAX_OVERFLOW = 10
+DB_POOL_RECYCLE_SECONDS = 1800
+
 # Database Connection
 @st.cache_resource
 def init_db():
@@ -64,7 +90,13 @@ def init_db():
         DB_HOST = st.secrets["DB"]["HOST"]
         DB_PORT = st.secrets["DB"]["PORT"]
         DB_NAME = st.secrets["DB"]["NAME"]
-        engine = create_engine(f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}')
+        engine = create_engine(
+            f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}',
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_pre_ping=True,  # Replace connections the server dropped while idle
+            pool_recycle=DB_POOL_RECYCLE_SECONDS
+        )
         return engine
     except KeyError as e:
         st.error(f"🚨 Missing database configuration for {e}.")
@@ -72,89 +104,176 @@ def init_db():
 
 engine = init_db()
 
-# ORM Setup and Table Creation
-Base.metadata.create_all(engine, checkfirst=True)
-SessionLocal = sessionmaker(bind=engine)
+# ORM Setup and Table Creation (once per server process, not on every rerun)
+@st.cache_resource
+def init_schema(_engine):
+    Base.metadata.create_all(_engine, checkfirst=True)
+    upgrade_schema(_engine)
+    create_missing_indexes(_engine)
+    create_materialized_views(_engine)
+
+init_schema(engine)
+# One thread-local session per script run; expire_on_commit=False keeps returned objects readable
+SessionLocal = scoped_session(sessionmaker(bind=engine, expire_on_commit=False))
+# Analytics reads through server-side cursors so large scans arrive in chunks
+analytics_engine = engine.execution_options(stream_results=True)
+
+@contextmanager
+def session_scope(**session_kwargs):
+    """
+    Yields the run's session, committing on success and rolling back on error.
+    The connection is returned to the pool when the block exits.
+    Keyword arguments (e.g. bind) configure the session being created.
+    """
+    session = SessionLocal(**session_kwargs)
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        SessionLocal.remove()
+
+# Shared by all sessions for database writes that run alongside the answer pipeline
+@st.cache_resource
+def get_db_executor():
+    return ThreadPoolExecutor(max_workers=DB_EXECUTOR_WORKERS, thread_name_prefix="db-writer")
 
 # Function Definitions
 
-def save_feedback_to_db(user_id, feedback_type):
+def _insert_feedback(session, user_id, feedback_type, now=None):
+    # INSERT ... RETURNING hands back the new primary key in the same round-trip
+    return session.execute(
+        insert(Feedback)
+        .values(user_id=user_id, feedback_type=feedback_type, feedback_time=now or datetime.utcnow())
+        .returning(Feedback.feedback_id)
+    ).scalar_one()
+
+def create_neutral_feedback(user_id, now=None):
+    """
+    Inserts the 'neutral' feedback row a new answer starts with and returns its id.
+    Runs on the DB executor, off the script thread, so errors are raised rather than shown.
+    """
+    with session_scope() as session:
+        return _insert_feedback(session, user_id, 'neutral', now)
+
+def delete_feedback(feedback_id):
+    """
+    Deletes a feedback row that no chat row references.
+    Safe to run on the DB executor: errors are raised rather than shown.
+    """
+    with session_scope() as session:
+        session.execute(delete(Feedback).where(Feedback.feedback_id == feedback_id))
+
+def resolve_pending_feedback(feedback_future):
+    # Id of the pre-created feedback row, or None if its insert failed
     try:
-        session = SessionLocal()
-        feedback = Feedback(
-            user_id=user_id,
-            feedback_type=feedback_type,
-            feedback_time=datetime.utcnow()
-        )
-        session.add(feedback)
-        session.commit()
-        session.refresh(feedback)
-        feedback_id = feedback.feedback_id
-        session.close()
-        return feedback_id
-    except Exception as e:
-        st.error(f"🚨 Database Error: {e}")
-        st.error(traceback.format_exc())
+        return feedback_future.result()
+    except Exception:
         return None
 
-def update_feedback(feedback_id, feedback_type):
-    try:
-        session = SessionLocal()
-        feedback = session.query(Feedback).filter_by(feedback_id=feedback_id).first()
-        if feedback:
-            feedback.feedback_type = feedback_type
-            feedback.feedback_time = datetime.utcnow()
-            session.commit()
-        session.close()
-    except Exception as e:
-        st.error(f"🚨 Database Error: {e}")
+def discard_pending_feedback(feedback_id):
+    # Drops the pre-created feedback row when its question's chat row was never saved
+    if feedback_id is not None:
+        submit_db_write(delete_feedback, feedback_id, description="the cleanup of an unused feedback row")
+
+def write_feedback(feedback_id, feedback_type, now=None):
+    """
+    Sets the type of an existing feedback row.
+    Safe to run on the DB executor: errors are raised rather than shown.
+    """
+    with session_scope() as session:
+        # A single UPDATE; no SELECT to load the row first
+        session.execute(
+            update(Feedback)
+            .where(Feedback.feedback_id == feedback_id)
+            .values(feedback_type=feedback_type, feedback_time=now or datetime.utcnow())
+        )
+    # Drop the cached history so the new type is read back
+    load_chat_history_from_db.clear()
+
+def is_question_cap_violation(error):
+    """
+    True when an IntegrityError comes from the (user_id, question_index) unique index
+    or the question_index check, i.e. the user already asked MAX_QUESTIONS questions.
+    """
+    diag = getattr(getattr(error, 'orig', None), 'diag', None)
+    return isinstance(error, IntegrityError) and getattr(diag, 'constraint_name', None) in QUESTION_CAP_CONSTRAINTS
+
+def report_chat_save_error(error):
+    if is_question_cap_violation(error):
+        st.warning(f"⚠️ You have reached the maximum of {MAX_QUESTIONS} questions allowed.")
+    else:
+        st.error(f"🚨 Database Error: {error}")
         st.error(traceback.format_exc())
 
-def get_feedback_type(feedback_id):
+def save_chat_history_to_db(user_id, question, answer, game_id=None, feedback_id=None, is_related=False, question_index=None, now=None):
+    # The chat row and its feedback share one timestamp
+    now = now or datetime.utcnow()
     try:
-        session = SessionLocal()
-        feedback = session.query(Feedback).filter_by(feedback_id=feedback_id).first()
-        feedback_type = feedback.feedback_type if feedback else None
-        session.close()
-        return feedback_type
+        with session_scope() as session:
+            # If feedback_id is None, save a 'neutral' feedback in the same transaction
+            if feedback_id is None:
+                feedback_id = _insert_feedback(session, user_id, 'neutral', now)
+            chat_id = session.execute(
+                insert(ChatHistory)
+                .values(
+                    user_id=user_id,
+                    question=question,
+                    answer=answer,
+                    timestamp=now,
+                    game_id=game_id,
+                    feedback_id=feedback_id,
+                    is_related=is_related,
+                    question_index=question_index
+                )
+                .returning(ChatHistory.chat_id)  # Use chat_id instead of chat_history_id
+            ).scalar_one()
+        load_chat_history_from_db.clear()
+        return feedback_id, chat_id
     except Exception as e:
-        st.error(f"🚨 Database Error: {e}")
-        st.error(traceback.format_exc())
-        return None
+        report_chat_save_error(e)
+        return None, None
 
-def save_chat_history_to_db(user_id, question, answer, game_id=None, feedback_id=None, is_related=False):
+def save_chat_answers_to_db(user_id, question, answers, first_question_index, feedback_id=None, now=None):
+    """
+    Saves every answer to one question in a single transaction, inserting the feedback and
+    chat history rows as two multi-row INSERT ... RETURNING statements instead of one pair per answer.
+    Returns one (feedback_id, chat_id) pair per answer, all None if the save failed.
+    """
+    now = now or datetime.utcnow()
     try:
-        session = SessionLocal()
-        # If feedback_id is None, save a 'neutral' feedback
-        if feedback_id is None:
-            feedback = Feedback(
-                user_id=user_id,
-                feedback_type='neutral',
-                feedback_time=datetime.utcnow()
-            )
-            session.add(feedback)
-            session.commit()
-            session.refresh(feedback)
-            feedback_id = feedback.feedback_id
-        chat_history = ChatHistory(
-            user_id=user_id,
-            question=question,
-            answer=answer,
-            timestamp=datetime.utcnow(),
-            game_id=game_id,
-            feedback_id=feedback_id,
-            is_related=is_related
-        )
-        session.add(chat_history)
-        session.commit()
-        session.refresh(chat_history)
-        chat_id = chat_history.chat_id  # Use chat_id instead of chat_history_id
-        session.close()
-        return feedback_id, chat_id
+        with session_scope() as session:
+            # A pre-created feedback row (see create_neutral_feedback) goes to the first answer
+            feedback_ids = [] if feedback_id is None else [feedback_id]
+            missing = len(answers) - len(feedback_ids)
+            if missing > 0:
+                feedback_ids += session.execute(
+                    insert(Feedback).returning(Feedback.feedback_id, sort_by_parameter_order=True),
+                    [{"user_id": user_id, "feedback_type": 'neutral', "feedback_time": now}] * missing
+                ).scalars().all()
+            chat_ids = session.execute(
+                insert(ChatHistory).returning(ChatHistory.chat_id, sort_by_parameter_order=True),
+                [
+                    {
+                        "user_id": user_id,
+                        "question": question,
+                        "answer": ans["answer"],
+                        "timestamp": now,
+                        "game_id": ans["game_id"],
+                        "feedback_id": answer_feedback_id,
+                        "is_related": True,
+                        "question_index": first_question_index + offset
+                    }
+                    for offset, (ans, answer_feedback_id) in enumerate(zip(answers, feedback_ids))
+                ]
+            ).scalars().all()
+        load_chat_history_from_db.clear()
+        return list(zip(feedback_ids, chat_ids))
     except Exception as e:
-        st.error(f"🚨 Database Error: {e}")
-        st.error(traceback.format_exc())
-        return None, None
+        report_chat_save_error(e)
+    return [(None, None)] * len(answers)
 
 def validate_user_info(user_info):
     errors = []
@@ -162,7 +281,7 @@ def validate_user_info(user_info):
     # Username validation: only letters and numbers
     if not user_info['userName'].strip():
         errors.append("🔴 **User Name** cannot be empty.")
-    elif not re.match("^[A-Za-z0-9]+$", user_info['userName']):
+    elif not _USERNAME_RE.match(user_info['userName']):
         errors.append("🔴 **User Name** can only contain letters and numbers (no spaces or symbols).")
 
     if user_info['gender'] not in ['Male', 'Female', 'Other', 'Prefer not to say']:
@@ -175,52 +294,85 @@ def validate_user_info(user_info):
 
 def save_user_info_to_db(user_info):
     try:
-        session = SessionLocal()
-        existing_user = session.query(User).filter(User.user_name.ilike(user_info['userName'])).first()
-        if existing_user:
-            st.error("🚨 Username already exists. Please choose a different username.")
-            session.close()
-            return None
-
-        user = User(
-            user_name=user_info['userName'],
-            gender=user_info['gender'],
-            age=user_info['age'],
-            registration_time=datetime.utcnow()
-        )
-        session.add(user)
-        session.commit()
-        session.refresh(user)
-        user_id = user.user_id
-        session.close()
-        return user_id
+        with session_scope() as session:
+            existing_user = session.query(User).filter(func.lower(User.user_name) == user_info['userName'].lower()).first()
+            if existing_user:
+                st.error("🚨 Username already exists. Please choose a different username.")
+                return None
+
+            user = User(
+                user_name=user_info['userName'],
+                gender=user_info['gender'],
+                age=user_info['age'],
+                registration_time=datetime.utcnow()
+            )
+            session.add(user)
+            session.flush()
+            return user.user_id
     except Exception as e:
         st.error(f"🚨 Database Error: {e}")
         st.error(traceback.format_exc())
         return None
 
+# Cached per user; cleared whenever a chat entry or its feedback is written
+@st.cache_data(ttl=300, show_spinner=False)
 def load_chat_history_from_db(user_id):
-    session = SessionLocal()
-    chat_entries = session.query(ChatHistory).filter_by(user_id=user_id).order_by(ChatHistory.timestamp.asc()).all()
+    with session_scope() as session:
+        # Load each entry's feedback and searched game in the same query instead of one lookup per entry
+        chat_entries = (
+            session.query(ChatHistory)
+            .options(joinedload(ChatHistory.feedback), joinedload(ChatHistory.searched_game))
+            .filter_by(user_id=user_id)
+            .order_by(ChatHistory.timestamp.asc())
+            .all()
+        )
     chat_history = []
     for entry in chat_entries:
-        feedback_type = 'neutral'
-        if entry.feedback_id:
-            feedback = session.query(Feedback).filter_by(feedback_id=entry.feedback_id).first()
-            if feedback:
-                feedback_type = feedback.feedback_type
+        feedback_type = entry.feedback.feedback_type if entry.feedback else 'neutral'
+        searched_game = entry.searched_game
         chat_history.append({
             "question": entry.question,
             "answer": entry.answer,
             "game_id": entry.game_id,
+            "searched_game_id": searched_game.game_id if searched_game else None,
+            "searched_time": searched_game.searched_time if searched_game else None,
             "is_related": entry.is_related,
             "feedback_id": entry.feedback_id,
             "feedback_type": feedback_type,
             "rewritten_question": None  # You may need to add this field to your database to store rewritten question
         })
-    session.close()
     return chat_history
 
+def submit_db_write(fn, *args, description):
+    """
+    Runs a write on the DB executor so the page re-renders without waiting for the commit.
+    Failures are reported by report_failed_writes on a later rerun.
+    """
+    future = get_db_executor().submit(fn, *args)
+    st.session_state.setdefault('pending_writes', []).append((future, description))
+
+def report_failed_writes():
+    pending = []
+    for future, description in st.session_state.get('pending_writes', []):
+        if not future.done():
+            pending.append((future, description))
+        elif future.exception() is not None:
+            st.toast(f"🚨 Could not save {description}: {future.exception()}")
+    st.session_state['pending_writes'] = pending
+
+FEEDBACK_OPTIONS = ['up', 'neutral', 'down']
+FEEDBACK_DISPLAY = {
+    'up': '👍 Upvote',
+    'down': '👎 Downvote',
+    'neutral': '😐 Neutral'
+}
+
+def _on_feedback_change(feedback_id, chat):
+    feedback_type = st.session_state[f"fb_{feedback_id}"]
+    submit_db_write(write_feedback, feedback_id, feedback_type, datetime.utcnow(), description="your feedback")
+    st.session_state['feedback_given'][feedback_id] = feedback_type
+    chat['feedback_type'] = feedback_type
+
 def check_session_timeout():
     if 'last_activity' in st.session_state:
         now = datetime.utcnow()
@@ -245,7 +397,7 @@ if page == "Welcome":
 
     Let's get started!
     """)
-    st.info("ℹ️ You can ask up to 3 questions.")
+    st.info(f"ℹ️ You can ask up to {MAX_QUESTIONS} questions.")
 
     st.header("👤 User Registration & Login")
 
@@ -307,9 +459,8 @@ if page == "Welcome":
             if not login_username.strip():
                 st.error("🔴 **Username** cannot be empty.")
             else:
-                session = SessionLocal()
-                user = session.query(User).filter(User.user_name.ilike(login_username.strip())).first()
-                session.close()
+                with session_scope() as session:
+                    user = session.query(User).filter(func.lower(User.user_name) == login_username.strip().lower()).first()
                 if user:
                     st.success(f"✅ Logged in as {user.user_name}!")
                     # Clear session state before setting new user data
@@ -324,6 +475,7 @@ if page == "Welcome":
                     }
                     # Load user's chat history from the database
                     st.session_state['chat_history'] = load_chat_history_from_db(user.user_id)
+                    st.session_state['question_count'] = len(st.session_state['chat_history'])
                     st.session_state['last_activity'] = datetime.utcnow()
                     st.success(f"Welcome, {user.user_name}!")  # Display a welcome message
                 else:
@@ -344,7 +496,7 @@ elif page == "Ask Questions":
         st.write(f"**Name:** {st.session_state['user_info']['userName']}")
         st.write(f"**Gender:** {st.session_state['user_info']['gender']}")
         st.write(f"**Age:** {st.session_state['user_info']['age']}")
-        st.markdown(f"### Welcome, **{st.session_state['user_info']['userName']}**! You can ask up to 3 questions.")
+        st.markdown(f"### Welcome, **{st.session_state['user_info']['userName']}**! You can ask up to {MAX_QUESTIONS} questions.")
         user_query = st.text_input("💡 **Enter your question about games:**", key="user_query")
 
         if 'chat_history' not in st.session_state:
@@ -353,49 +505,105 @@ elif page == "Ask Questions":
         if 'feedback_given' not in st.session_state:
             st.session_state['feedback_given'] = {}
 
+        # Feedback is saved in the background and shown optimistically; surface any failed saves
+        report_failed_writes()
+
         if st.button("🗨️ Get Answer") and user_query:
             try:
-                session_db = SessionLocal()
-                question_count = session_db.query(ChatHistory).filter(ChatHistory.user_id == st.session_state['user_id']).count()
-                session_db.close()
-                if question_count >= 3:
-                    st.warning("⚠️ You have reached the maximum of 3 questions allowed.")
+                # Counted from the history loaded at login, so the cap needs no database query
+                if st.session_state.get('question_count', 0) >= MAX_QUESTIONS:
+                    st.warning(f"⚠️ You have reached the maximum of {MAX_QUESTIONS} questions allowed.")
                 else:
-                    with st.spinner("🔍 Processing your question..."):
-                        answer_result = get_answer(
-                            user_query.strip(),
-                            st.session_state['user_id'],
-                            SessionLocal(),  # Pass a new session instance
-                            k=1,  # Fetch only 1 relevant game
-                            hybrid=False,  # Indicate that we're using pure vector search
-                            weaviate_client=client
-                        )
+                    # One timestamp for every row this question writes
+                    now = datetime.utcnow()
+                    # Insert the answer's feedback row while the answer is being generated
+                    feedback_future = get_db_executor().submit(create_neutral_feedback, st.session_state['user_id'], now)
+                    # Set once a saved chat row references the pre-created feedback row
+                    adopted = False
+                    try:
+                        with st.spinner("🔍 Processing your question..."):
+                            answer_result = get_answer(
+                                user_query.strip(),
+                                st.session_state['user_id'],
+                                session_scope,  # get_answer opens a session only around its writes
+                                k=1,  # Fetch only 1 relevant game
+                                hybrid=False,  # Indicate that we're using pure vector search
+                                weaviate_client=client,
+                                stream=True  # Answers are streamed into the page below
+                            )
+                        # None if the insert failed; save_chat_history_to_db creates it instead
+                        pending_feedback_id = resolve_pending_feedback(feedback_future)
 
-                    if answer_result['is_related']:
-                        rewritten_question = answer_result.get('rewritten_question', '')
-                        if rewritten_question and rewritten_question != user_query.strip():
-                            st.markdown(f"**Rewritten Question:** {rewritten_question}")
-                        if "answers" in answer_result:
-                            for idx, ans in enumerate(answer_result["answers"], 1):
-                                st.subheader(f"**Game Name:** {ans['game_name']}")
-                                st.write(ans["answer"])
+                        if answer_result['is_related']:
+                            rewritten_question = answer_result.get('rewritten_question', '')
+                            if rewritten_question and rewritten_question != user_query.strip():
+                                st.markdown(f"**Rewritten Question:** {rewritten_question}")
+                            if "answers" in answer_result:
+                                # Stream each answer as it is generated, then save them all together
+                                for ans in answer_result["answers"]:
+                                    st.subheader(f"**Game Name:** {ans['game_name']}")
+                                    ans["answer"] = st.write_stream(ans.pop("answer_stream"))
+                                # Chat rows reference the searched games, so their background write must land first
+                                try:
+                                    answer_result['searched_games_saved'].result()
+                                except Exception as e:
+                                    # Keep the answers but drop the reference to games that were never stored
+                                    st.error(f"🚨 Error saving searched games to DB: {e}")
+                                    for ans in answer_result["answers"]:
+                                        ans["game_id"] = None
+                                saved_rows = save_chat_answers_to_db(
+                                    user_id=st.session_state['user_id'],
+                                    question=user_query.strip(),
+                                    answers=answer_result["answers"],
+                                    first_question_index=st.session_state.get('question_count', 0) + 1,
+                                    feedback_id=pending_feedback_id,
+                                    now=now
+                                )
+                                st.session_state['question_count'] = st.session_state.get('question_count', 0) + sum(
+                                    chat_id is not None for _, chat_id in saved_rows
+                                )
+                                adopted = saved_rows[0][1] is not None
+                                for ans, (feedback_id, chat_id) in zip(answer_result["answers"], saved_rows):
+                                    st.session_state['chat_history'].append({
+                                        "question": user_query.strip(),
+                                        "answer": ans["answer"],
+                                        "game_id": ans["game_id"],
+                                        "searched_game_id": ans["game_id"],
+                                        # The stored first-search time is read back when history reloads
+                                        "searched_time": None,
+                                        "is_related": True,
+                                        "feedback_id": feedback_id,
+                                        "feedback_type": 'neutral',
+                                        "rewritten_question": rewritten_question
+                                    })
+                            else:
+                                st.warning(answer_result['message'])
+                                rewritten_question = answer_result.get('rewritten_question', '')
+                                if rewritten_question and rewritten_question != user_query.strip():
+                                    st.markdown(f"**Rewritten Question:** {rewritten_question}")
                                 feedback_id, chat_id = save_chat_history_to_db(
                                     user_id=st.session_state['user_id'],
                                     question=user_query.strip(),
-                                    answer=ans["answer"],
-                                    game_id=ans["game_id"],
-                                    is_related=True
+                                    answer=answer_result['message'],
+                                    feedback_id=pending_feedback_id,
+                                    is_related=True,
+                                    question_index=st.session_state.get('question_count', 0) + 1,
+                                    now=now
                                 )
+                                adopted = chat_id is not None
+                                if adopted:
+                                    st.session_state['question_count'] = st.session_state.get('question_count', 0) + 1
                                 st.session_state['chat_history'].append({
                                     "question": user_query.strip(),
-                                    "answer": ans["answer"],
-                                    "game_id": ans["game_id"],
+                                    "answer": answer_result['message'],
+                                    "game_id": None,
                                     "is_related": True,
                                     "feedback_id": feedback_id,
                                     "feedback_type": 'neutral',
                                     "rewritten_question": rewritten_question
                                 })
                         else:
+                            # Save the non-related question and the message
                             st.warning(answer_result['message'])
                             rewritten_question = answer_result.get('rewritten_question', '')
                             if rewritten_question and rewritten_question != user_query.strip():
@@ -404,38 +612,27 @@ elif page == "Ask Questions":
                                 user_id=st.session_state['user_id'],
                                 question=user_query.strip(),
                                 answer=answer_result['message'],
-                                is_related=True
+                                feedback_id=pending_feedback_id,
+                                is_related=False,
+                                question_index=st.session_state.get('question_count', 0) + 1,
+                                now=now
                             )
+                            adopted = chat_id is not None
+                            if adopted:
+                                st.session_state['question_count'] = st.session_state.get('question_count', 0) + 1
                             st.session_state['chat_history'].append({
                                 "question": user_query.strip(),
                                 "answer": answer_result['message'],
                                 "game_id": None,
-                                "is_related": True,
+                                "is_related": False,
                                 "feedback_id": feedback_id,
                                 "feedback_type": 'neutral',
                                 "rewritten_question": rewritten_question
                             })
-                    else:
-                        # Save the non-related question and the message
-                        st.warning(answer_result['message'])
-                        rewritten_question = answer_result.get('rewritten_question', '')
-                        if rewritten_question and rewritten_question != user_query.strip():
-                            st.markdown(f"**Rewritten Question:** {rewritten_question}")
-                        feedback_id, chat_id = save_chat_history_to_db(
-                            user_id=st.session_state['user_id'],
-                            question=user_query.strip(),
-                            answer=answer_result['message'],
-                            is_related=False
-                        )
-                        st.session_state['chat_history'].append({
-                            "question": user_query.strip(),
-                            "answer": answer_result['message'],
-                            "game_id": None,
-                            "is_related": False,
-                            "feedback_id": feedback_id,
-                            "feedback_type": 'neutral',
-                            "rewritten_question": rewritten_question
-                        })
+                    finally:
+                        # Covers errors and reruns anywhere after the insert was submitted
+                        if not adopted:
+                            discard_pending_feedback(resolve_pending_feedback(feedback_future))
                 st.session_state['last_activity'] = datetime.utcnow()
             except Exception as e:
                 st.error(f"🚨 An error occurred: {e}")
@@ -452,45 +649,32 @@ elif page == "Ask Questions":
                     st.markdown(f"**Rewritten Question:** {rewritten_question}")
                 st.markdown(f"**A{idx}:**\n{chat['answer']}", unsafe_allow_html=True)
 
-                if chat.get('game_id'):
-                    session_db = SessionLocal()
-                    searched_game = session_db.query(SearchedGame).filter_by(game_id=chat['game_id']).first()
-                    session_db.close()
-                    if searched_game:
-                        st.markdown(f"**Searched Game ID:** {searched_game.game_id} | **Search Time:** {searched_game.searched_time}")
+                # Filled in when the entry is loaded or created, so reruns do not query SearchedGame
+                if chat.get('searched_game_id'):
+                    if chat.get('searched_time'):
+                        st.markdown(f"**Searched Game ID:** {chat['searched_game_id']} | **Search Time:** {chat['searched_time']}")
+                    else:
+                        st.markdown(f"**Searched Game ID:** {chat['searched_game_id']}")
                 st.markdown(f"**Game Related:** {'Yes' if chat.get('is_related') else 'No'}")
 
-                # Add feedback buttons
+                # Add the feedback picker; _on_feedback_change saves a choice once, before the rerun
                 feedback_id = chat.get('feedback_id')
                 feedback_type = st.session_state['feedback_given'].get(feedback_id, chat.get('feedback_type', 'neutral'))
                 if feedback_id is not None:
                     if feedback_type == 'neutral':
-                        col1, col2, col3 = st.columns(3)
-                        with col1:
-                            if st.button("👍", key=f"upvote_{feedback_id}"):
-                                update_feedback(feedback_id, 'up')
-                                st.session_state['feedback_given'][feedback_id] = 'up'
-                                chat['feedback_type'] = 'up'
-                                feedback_type = 'up'
-                        with col2:
-                            if st.button("😐", key=f"neutral_{feedback_id}"):
-                                update_feedback(feedback_id, 'neutral')
-                                st.session_state['feedback_given'][feedback_id] = 'neutral'
-                                chat['feedback_type'] = 'neutral'
-                                feedback_type = 'neutral'
-                        with col3:
-                            if st.button("👎", key=f"downvote_{feedback_id}"):
-                                update_feedback(feedback_id, 'down')
-                                st.session_state['feedback_given'][feedback_id] = 'down'
-                                chat['feedback_type'] = 'down'
-                                feedback_type = 'down'
-                    if feedback_type != 'neutral':
-                        feedback_display = {
-                            'up': '👍 Upvote',
-                            'down': '👎 Downvote',
-                            'neutral': '😐 Neutral'
-                        }
-                        st.markdown(f"**Feedback Given:** {feedback_display.get(feedback_type, '😐 Neutral')}")
+                        st.radio(
+                            "Feedback",
+                            FEEDBACK_OPTIONS,
+                            index=FEEDBACK_OPTIONS.index('neutral'),
+                            format_func=FEEDBACK_DISPLAY.get,
+                            key=f"fb_{feedback_id}",
+                            horizontal=True,
+                            label_visibility="collapsed",
+                            on_change=_on_feedback_change,
+                            args=(feedback_id, chat)
+                        )
+                    else:
+                        st.markdown(f"**Feedback Given:** {FEEDBACK_DISPLAY.get(feedback_type, '😐 Neutral')}")
                         feedbacks_given += 1
                 st.markdown("\n")
 
@@ -503,6 +687,5 @@ elif page == "Ask Questions":
 
 elif page == "Analytics":
     #st.title("📈 Comprehensive Analytics Dashboard")
-    session = SessionLocal()
-    analytics.show_analytics(session)
-    session.close()
+    with session_scope(bind=analytics_engine) as session:
+        analytics.show_analytics(session)
@@ -0,0 +1,60 @@
+# embedding_cache.py
+
+import hashlib
+import sqlite3
+import threading
+import numpy as np
+
+# SQLite file holding every text embedded so far; survives reruns and restarts
+EMBEDDING_CACHE_PATH = "data/embedding-cache.sqlite"
+
+class EmbeddingCache:
+    """
+    Persistent cache of sentence embeddings keyed by SHA-256 of (model name, text).
+    Vectors are stored as float16 blobs in SQLite and loaded into memory at startup,
+    so only texts never seen before go through the model.
+    """
+
+    def __init__(self, model_name, path=EMBEDDING_CACHE_PATH):
+        self._model_name = model_name
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (hash TEXT PRIMARY KEY, vec BLOB NOT NULL)"
+        )
+        self._conn.commit()
+        self._vectors = {
+            key: np.frombuffer(blob, dtype=np.float16)
+            for key, blob in self._conn.execute("SELECT hash, vec FROM embeddings")
+        }
+
+    def key(self, text):
+        return hashlib.sha256(f"{self._model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def encode(self, model, texts, **encode_kwargs):
+        """
+        Returns a float32 array with one embedding row per text.
+        Texts missing from the cache are encoded in one `model.encode` call and stored.
+
+        Args:
+            model: SentenceTransformer used for cache misses.
+            texts (list): Texts to embed.
+            **encode_kwargs: Passed through to `model.encode` (e.g. batch_size).
+        """
+        keys = [self.key(text) for text in texts]
+        # Dict keeps one copy of texts repeated within the call
+        missing = {key: text for key, text in zip(keys, texts) if key not in self._vectors}
+        if missing:
+            vectors = model.encode(list(missing.values()), **encode_kwargs)
+            rows = [
+                (key, np.asarray(vector, dtype=np.float16).tobytes())
+                for key, vector in zip(missing, vectors)
+            ]
+            with self._lock:
+                self._conn.executemany("INSERT OR REPLACE INTO embeddings (hash, vec) VALUES (?, ?)", rows)
+                self._conn.commit()
+                for key, blob in rows:
+                    self._vectors[key] = np.frombuffer(blob, dtype=np.float16)
+        if not keys:
+            return np.empty((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+        return np.stack([self._vectors[key] for key in keys]).astype(np.float32)
@@ -1,6 +1,6 @@
 # models.py
 
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Index, CheckConstraint, func, text
 #from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -15,19 +15,28 @@ class User(Base):
     user_name = Column(String(100), nullable=False, unique=True)
     gender = Column(String(20), nullable=False)
     age = Column(Integer, nullable=False)
-    registration_time = Column(DateTime, default=datetime.utcnow)
+    registration_time = Column(DateTime, default=datetime.utcnow, index=True)
 
     # Relationships
     feedbacks = relationship("Feedback", back_populates="user", cascade="all, delete-orphan")
     chat_histories = relationship("ChatHistory", back_populates="user", cascade="all, delete-orphan")
 
+# Case-insensitive username lookups probe this index instead of scanning with ILIKE
+Index('ix_users_lower_name', func.lower(User.user_name), unique=True)
+
 class Feedback(Base):
     __tablename__ = 'feedback'
 
     feedback_id = Column(Integer, primary_key=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
     feedback_type = Column(String(10), nullable=False)  # e.g., 'up', 'down', 'neutral'
-    feedback_time = Column(DateTime, default=datetime.utcnow)
+    feedback_time = Column(DateTime, default=datetime.utcnow, index=True)
+
+    __table_args__ = (
+        # Partial index for the upvote leaderboard
+        Index('ix_feedback_up_user', 'user_id', postgresql_where=text("feedback_type = 'up'")),
+        Index('ix_feedback_user', 'user_id'),
+    )
 
     # Relationships
     user = relationship("User", back_populates="feedbacks")
@@ -37,15 +46,20 @@ class SearchedGame(Base):
     __tablename__ = 'searched_games'
 
     game_id = Column(Integer, primary_key=True)
-    game_name = Column(String(100), nullable=False)
+    game_name = Column(String(100), nullable=False, index=True)
     subcategory = Column(String(100))
     level = Column(String(100))
     category = Column(String(100))
-    searched_time = Column(DateTime, default=datetime.utcnow)
+    searched_time = Column(DateTime, default=datetime.utcnow, index=True)
 
     # Relationships
     chat_histories = relationship("ChatHistory", back_populates="searched_game", cascade="all, delete-orphan")
 
+# Each user may ask at most this many questions; enforced by the chat_history constraints below
+MAX_QUESTIONS = 3
+# Constraints whose violation means the user already asked MAX_QUESTIONS questions
+QUESTION_CAP_CONSTRAINTS = frozenset({'ux_chat_history_user_question', 'ck_chat_history_question_index'})
+
 class ChatHistory(Base):
     __tablename__ = 'chat_history'
 
@@ -56,7 +70,17 @@ class ChatHistory(Base):
     game_id = Column(Integer, ForeignKey('searched_games.game_id', ondelete='CASCADE'))
     feedback_id = Column(Integer, ForeignKey('feedback.feedback_id', ondelete='CASCADE'))
     is_related = Column(Boolean, default=False, nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    # 1-based position of the question for its user; NULL on rows saved before the cap moved here
+    question_index = Column(Integer)
+
+    __table_args__ = (
+        # A user's history is read filtered by user_id and ordered by timestamp
+        Index('ix_chat_history_user_time', 'user_id', 'timestamp'),
+        # The question cap is enforced by the INSERT itself
+        Index('ux_chat_history_user_question', 'user_id', 'question_index', unique=True),
+        CheckConstraint(f'question_index BETWEEN 1 AND {MAX_QUESTIONS}', name='ck_chat_history_question_index'),
+    )
 
     # Relationships
     user = relationship("User", back_populates="chat_histories")
@@ -64,5 +88,76 @@ class ChatHistory(Base):
     searched_game = relationship("SearchedGame", back_populates="chat_histories")
 
 
-
-
+def upgrade_schema(engine):
+    """
+    Adds the columns and constraints introduced after the first deployment to existing tables.
+    `Base.metadata.create_all` never alters a table that already exists.
+    """
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE chat_history ADD COLUMN IF NOT EXISTS question_index INTEGER"))
+        conn.execute(text(f"""
+            DO $$ BEGIN
+                ALTER TABLE chat_history ADD CONSTRAINT ck_chat_history_question_index
+                    CHECK (question_index BETWEEN 1 AND {MAX_QUESTIONS});
+            EXCEPTION WHEN duplicate_object THEN NULL;
+            END $$
+        """))
+
+def create_missing_indexes(engine):
+    """
+    Creates the indexes declared above on tables that already existed before they were added.
+    `Base.metadata.create_all` only emits CREATE INDEX for tables it creates itself.
+    """
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+
+# Materialized views behind the analytics top-N charts: view name -> (query, unique key column).
+# REFRESH ... CONCURRENTLY needs a unique index on plain columns, hence question_hash.
+MATERIALIZED_VIEWS = {
+    "mv_top_games": ("""
+        SELECT game_name, count(*) AS search_count
+        FROM searched_games
+        GROUP BY game_name
+        ORDER BY search_count DESC
+        LIMIT 50
+    """, "game_name"),
+    # Aggregates on the integer user_id first and joins only the top rows to users
+    "mv_top_upvoters": ("""
+        SELECT u.user_name, p.upvote_count
+        FROM (
+            SELECT user_id, count(*) AS upvote_count
+            FROM feedback
+            WHERE feedback_type = 'up'
+            GROUP BY user_id
+            ORDER BY upvote_count DESC
+            LIMIT 50
+        ) p
+        JOIN users u USING (user_id)
+    """, "user_name"),
+    "mv_top_questions": ("""
+        SELECT md5(question) AS question_hash, question, count(*) AS ask_count
+        FROM chat_history
+        GROUP BY question
+        ORDER BY ask_count DESC
+        LIMIT 50
+    """, "question_hash"),
+}
+
+def create_materialized_views(engine):
+    """
+    Creates the analytics materialized views and their unique indexes if they do not exist yet.
+    """
+    with engine.begin() as conn:
+        for name, (query, key_column) in MATERIALIZED_VIEWS.items():
+            conn.execute(text(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {name} AS {query}"))
+            conn.execute(text(f"CREATE UNIQUE INDEX IF NOT EXISTS ux_{name} ON {name} ({key_column})"))
+
+def refresh_materialized_views(engine):
+    """
+    Recomputes the analytics materialized views without blocking readers.
+    Deployments with pg_cron can schedule the same REFRESH statements hourly instead.
+    """
+    with engine.begin() as conn:
+        for name in MATERIALIZED_VIEWS:
+            conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {name}"))
@@ -1,63 +1,225 @@
 import weaviate
 from weaviate import Client
 from models import SearchedGame
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from datetime import datetime
 import traceback
+import json
 import openai
 import streamlit as st
 from sentence_transformers import SentenceTransformer
+import torch
+import numpy as np
+import os
+from embedding_cache import EmbeddingCache
+from concurrent.futures import Future, ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from functools import lru_cache
+from collections import defaultdict
+import queue
+import threading
+import time
 
-# Initialize Sentence Transformer model for query vectorization
-query_model = SentenceTransformer('all-MiniLM-L6-v2')
+# Use every core for the encoder's matmuls; grad mode is per thread, so encode() also runs under inference_mode
+torch.set_num_threads(os.cpu_count() or 1)
+torch.set_grad_enabled(False)
+
+QUERY_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+# Sentence Transformer model for query vectorization, loaded on first use and shared by all sessions
+@st.cache_resource
+def get_query_model():
+    """
+    Returns (model, variant_name). On CPU the Linear layers are quantized to int8 (dynamic)
+    and on GPU the weights are cast to fp16, both for faster query encoding;
+    variant_name keeps cached embeddings apart per variant.
+    """
+    model = SentenceTransformer(QUERY_MODEL_NAME)  # Placed on CUDA automatically when available
+    model.eval()
+    if model.device.type == 'cpu':
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        return model, f"{QUERY_MODEL_NAME}-int8"
+    if model.device.type == 'cuda':
+        return model.half(), f"{QUERY_MODEL_NAME}-fp16"
+    return model, QUERY_MODEL_NAME
+
+# Query embeddings persist across reruns and restarts
+@st.cache_resource
+def get_embedding_cache(model_name):
+    return EmbeddingCache(model_name)
 
 # Set your OpenAI API key (ensure you have this in your Streamlit secrets)
 openai.api_key = st.secrets["OPENAI"]["API_KEY"]  # Store your API key in Streamlit secrets
 
-# Function to check if the question is game-related using GPT-4o-mini
-def check_if_game_related(question):
+# Repeat questions and prompts are served from memory (temperature 0 makes completions deterministic)
+EMBEDDING_CACHE_SIZE = 4096
+COMPLETION_CACHE_SIZE = 1024
+
+@lru_cache(maxsize=EMBEDDING_CACHE_SIZE)
+def _encode(text):
+    # float32 ndarray straight from the model; read-only so the cached vector cannot be mutated by a caller
+    model, model_name = get_query_model()
+    with torch.inference_mode():
+        vector = get_embedding_cache(model_name).encode(model, [text])[0]
+    vector.flags.writeable = False
+    return vector
+
+# Vector searches arriving within this window are sent to Weaviate as one request
+BATCH_WINDOW_SECONDS = 0.05
+BATCH_MAX_QUERIES = 16
+BATCH_RESULT_TIMEOUT_SECONDS = 30
+
+class QueryBatcher:
     """
-    Determines if the question is related to games using the GPT-4o-mini model via OpenAI API.
-    Returns True if related, False otherwise.
+    Collects Get queries from concurrent sessions for a short window and sends them
+    to Weaviate as a single aliased multi_get request, resolving one future per query.
     """
-    prompt = f"Determine if the following question is related to games. Answer with 'Yes' or 'No'.\n\nQuestion: \"{question}\""
-    try:
-        response = call_gpt_4o_mini(prompt)
-        return 'yes' in response.lower()
-    except Exception as e:
-        st.error(f"🚨 Error calling GPT-4o-mini: {e}")
-        st.error(traceback.format_exc())
-        return False
+
+    def __init__(self, client, window=BATCH_WINDOW_SECONDS, max_queries=BATCH_MAX_QUERIES):
+        self._client = client
+        self._window = window
+        self._max_queries = max_queries
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="weaviate-query-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, get_builder):
+        """
+        Queues a `client.query.get(...)` builder and returns a Future for its result list.
+        """
+        future = Future()
+        self._queue.put((get_builder, future))
+        return future
+
+    def search(self, get_builder, timeout=BATCH_RESULT_TIMEOUT_SECONDS):
+        return self.submit(get_builder).result(timeout=timeout)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._window
+            while len(batch) < self._max_queries:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._execute(batch)
+
+    def _execute(self, batch):
+        try:
+            builders = [builder.with_alias(f"q{i}") for i, (builder, _) in enumerate(batch)]
+            response = self._client.query.multi_get(builders).do()
+            results = response.get('data', {}).get('Get', {})
+            for i, (_, future) in enumerate(batch):
+                future.set_result(results.get(f"q{i}") or [])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+# One batcher (and worker thread) per Weaviate client for the whole server process
+@st.cache_resource
+def get_query_batcher(_client):
+    return QueryBatcher(_client)
+
+def _run_concurrently(*calls):
+    """
+    Runs `(fn, *args)` calls on worker threads and returns their results in order.
+    The workers share the script run's context so their st.error messages still render.
+    """
+    ctx = get_script_run_ctx()
+
+    def attach_ctx():
+        add_script_run_ctx(threading.current_thread(), ctx)
+
+    with ThreadPoolExecutor(max_workers=len(calls), initializer=attach_ctx) as pool:
+        futures = [pool.submit(fn, *args) for fn, *args in calls]
+        return [future.result() for future in futures]
 
 # Function to call GPT-4o-mini model via OpenAI API
-def call_gpt_4o_mini(prompt):
+# Errors propagate out of the cached call, so failed requests are never cached
+@lru_cache(maxsize=COMPLETION_CACHE_SIZE)
+def _cached_completion(prompt, json_mode, max_tokens):
+    response = openai.chat.completions.create(
+        model="gpt-4o-mini",  # Specify the model
+        messages=[
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=max_tokens,
+        temperature=0.0,  # For deterministic output
+        response_format={"type": "json_object"} if json_mode else openai.NOT_GIVEN
+    )
+    # Access the content of the message correctly; finish_reason 'length' means max_tokens cut it off
+    choice = response.choices[0]
+    return choice.message.content.strip(), choice.finish_reason
+
+def call_gpt_4o_mini(prompt, json_mode=False, max_tokens=500):
     """
     Calls the GPT-4o-mini model to process the prompt using OpenAI API.
+    With json_mode the model is constrained to return a single JSON object.
+    max_tokens caps the generated output; latency grows with it, so short replies should pass less.
     """
     try:
-        response = openai.chat.completions.create(
-            model="gpt-4o-mini",  # Specify the model
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=500,  # Adjusted tokens
-            temperature=0.0  # For deterministic output
-        )
-        # Access the content of the message correctly
-        message_content = response.choices[0].message.content.strip()
-        return message_content
+        return _cached_completion(prompt, json_mode, max_tokens)[0]
     except Exception as e:
         st.error(f"🚨 OpenAI API Request Error: {e}")
         st.error(traceback.format_exc())
         return "No"
 
-# Function to preprocess the question using query rewriting techniques
-def preprocess_query(question):
+# Questions this close (cosine) to a game-topic anchor skip the GPT analysis call.
+# Anchors name the dataset's game categories, so generic "how do I play ..." questions
+# (instruments, sports broadcasts) do not match on the verb alone.
+GAME_ANCHOR_TEXTS = (
+    "What are the rules of this board game?",
+    "How do you play this card game?",
+    "Suggest an outdoor game for children to play in the playground",
+    "Team building games for a group of coworkers",
+    "Fun party games for adults",
+    "Educational games for kids in the classroom",
+    "Traditional and cultural games from around the world",
+    "Recommend a video game to play",
+)
+# all-MiniLM-L6-v2 scores paraphrases around 0.7 and above, and merely topical text in the 0.4-0.6 band.
+# Keep the bar at paraphrase level: a miss only costs the GPT call, a false match skips the relevance check.
+GAME_ANCHOR_THRESHOLD = 0.7
+
+@st.cache_resource
+def get_game_anchors():
+    # Unit-length anchor embeddings from the same query model
+    model, model_name = get_query_model()
+    with torch.inference_mode():
+        anchors = get_embedding_cache(model_name).encode(model, list(GAME_ANCHOR_TEXTS))
+    return anchors / np.linalg.norm(anchors, axis=1, keepdims=True)
+
+def is_clearly_game_related(question):
     """
-    Applies query rewriting techniques to the user's question.
+    Returns True when the question's embedding is close to a game-topic anchor.
+    Only confident matches short-circuit; everything else, including encoder errors, goes to GPT.
+    """
+    try:
+        vector = _encode(question)
+        similarity = get_game_anchors() @ (vector / (np.linalg.norm(vector) or 1.0))
+    except Exception:
+        return False
+    return bool(similarity.max() >= GAME_ANCHOR_THRESHOLD)
+
+# Room for the JSON wrapper and a short rewrite; the question's length is added per call,
+# up to a ceiling well inside the model's output limit
+ANALYZE_MAX_TOKENS = 120
+ANALYZE_MAX_TOKENS_LIMIT = 1000
+
+# Function to rewrite the question and judge whether it is game-related in one call
+def analyze_question(question):
+    """
+    Applies query rewriting techniques to the user's question and determines if it is related
+    to games, using a single JSON-mode GPT-4o-mini call.
+    Returns (is_related, rewritten_question).
     """
-    # Create a prompt that instructs the model to apply the techniques
     prompt = f"""
-Please rewrite the following question by applying the following query rewriting techniques:
+Rewrite the following question by applying these query rewriting techniques:
 
 1. Correct any spelling mistakes.
 2. Simplify the question to be more straightforward and easily understandable.
@@ -65,157 +227,238 @@ Please rewrite the following question by applying the following query rewriting
 4. Handle any negative queries correctly by rephrasing them to reflect the true intent.
 5. Paraphrase the question while maintaining its original meaning.
 
-Original Question: "{question}"
+Also determine whether the question (original or rewritten) is related to games.
+
+Respond with a JSON object with exactly these fields:
+- "is_related": true or false
+- "rewritten": the rewritten question as a string
 
-Rewritten Question:
+Original Question: "{question}"
 """
+    # A rewrite rarely outgrows the question; one token per character keeps the JSON from being cut off
+    max_tokens = min(ANALYZE_MAX_TOKENS + len(question), ANALYZE_MAX_TOKENS_LIMIT)
     try:
-        rewritten_question = call_gpt_4o_mini(prompt)
-        return rewritten_question.strip()
+        # Called directly so API errors raise here instead of coming back as a reply
+        reply, finish_reason = _cached_completion(prompt, True, max_tokens)
+        if finish_reason == "length":
+            # Truncated reply: search with the question as asked rather than reject it
+            return True, question
+        result = json.loads(reply)
+        rewritten_question = str(result.get('rewritten') or question).strip()
+        return bool(result.get('is_related')), rewritten_question
     except Exception as e:
-        st.error(f"🚨 Error preprocessing query with GPT-4o-mini: {e}")
+        st.error(f"🚨 Error analyzing query with GPT-4o-mini: {e}")
         st.error(traceback.format_exc())
-        return question  # Return the original question if an error occurs
+        return False, question  # Treat as unrelated and keep the original question
+
+# Game properties returned by every search
+_GAME_FIELDS = (
+    "gameId",
+    "gameName",
+    "alternateNames",
+    "subcategory",
+    "level",
+    "description",
+    "playersMax",
+    "ageRange",
+    "duration",
+    "equipmentNeeded",
+    "objective",
+    "skillsDeveloped",
+    "setupTime",
+    "place",
+    "physicalIntensityLevel",
+    "educationalBenefits",
+    "category",
+)
 
 # Function to search Weaviate using pure vector search
 def search_weaviate(question, client, k=1):
     """
     Searches Weaviate using pure vector search to find the answer to the question.
+    The query is sent through the shared QueryBatcher.
     Returns the search results.
     """
     try:
         # Generate vector for the query using SentenceTransformer
-        query_vector = query_model.encode(question).tolist()
+        # The client's get_vector() accepts numpy arrays directly
+        query_vector = _encode(question)
 
-        response = (
+        get_builder = (
             client.query
-            .get(
-                "Game",
-                [
-                    "gameId",
-                    "gameName",
-                    "alternateNames",
-                    "subcategory",
-                    "level",
-                    "description",
-                    "playersMax",
-                    "ageRange",
-                    "duration",
-                    "equipmentNeeded",
-                    "objective",
-                    "skillsDeveloped",
-                    "setupTime",
-                    "place",
-                    "physicalIntensityLevel",
-                    "educationalBenefits",
-                    "category",
-                    "_additional { id }"
-                ]
-            )
+            # The v3 builder only accepts (and may extend) a list, so it gets its own copy
+            .get("Game", list(_GAME_FIELDS))
             .with_near_vector({
                 "vector": query_vector,
                 "certainty": 0.7  # Lowered certainty threshold
             })
             .with_limit(k)
-            .do()
         )
 
-        # Extract the game results
-        return response.get('data', {}).get('Get', {}).get('Game', [])
+        # Batched with concurrent questions from other sessions; returns this query's games
+        return get_query_batcher(client).search(get_builder)
     except Exception as e:
         st.error(f"🚨 Error searching Weaviate: {e}")
         st.error(traceback.format_exc())
         return []
 
 # Function to save searched game to the database
-def save_searched_game_to_db(session_db, game_info):
+def save_searched_games_to_db(session_db, games_info):
     """
-    Saves the searched game information to the database.
+    Saves the searched games to the database in one INSERT ... ON CONFLICT DO NOTHING,
+    so games already recorded are skipped without a SELECT first.
+    The caller's session scope commits, or rolls back if the insert raises.
     Args:
         session_db: SQLAlchemy session.
-        game_info (dict): Information about the game.
+        games_info (list): Information about each game.
     """
-    try:
-        game_id = game_info.get('gameId')
-        if game_id:
-            existing_game = session_db.query(SearchedGame).filter_by(game_id=game_id).first()
-            if not existing_game:
-                searched_game = SearchedGame(
-                    game_id=game_id,
-                    game_name=game_info.get('gameName'),
-                    subcategory=game_info.get('subcategory'),
-                    level=game_info.get('level'),
-                    category=game_info.get('category'),
-                    searched_time=datetime.utcnow()
-                )
-                session_db.add(searched_game)
-                session_db.commit()
-    except Exception as e:
-        st.error(f"🚨 Error saving searched game to DB: {e}")
-        st.error(traceback.format_exc())
+    now = datetime.utcnow()
+    rows = [
+        {
+            'game_id': game_info.get('gameId'),
+            'game_name': game_info.get('gameName'),
+            'subcategory': game_info.get('subcategory'),
+            'level': game_info.get('level'),
+            'category': game_info.get('category'),
+            'searched_time': now
+        }
+        for game_info in games_info if game_info.get('gameId')
+    ]
+    if not rows:
+        return
+    session_db.execute(
+        pg_insert(SearchedGame).values(rows).on_conflict_do_nothing(index_elements=['game_id'])
+    )
 
-# Function to generate an answer using GPT-4o-mini
-def generate_answer_from_game_info(game_info, question):
-    """
-    Generates an answer based on the game information and the user's question.
-    """
-    game_description = game_info.get('description', 'No description available.')
-    game_name = game_info.get('gameName', 'Unknown Game')
+# Searched-game writes run off the request's critical path
+SAVE_WORKERS = 2
 
-    prompt = f"""
+@st.cache_resource
+def get_save_pool():
+    return ThreadPoolExecutor(max_workers=SAVE_WORKERS, thread_name_prefix="searched-games")
+
+def _save_searched_games_in_background(session_factory, games_info):
+    # Errors propagate to the returned Future; the script run that waits on it reports them.
+    # session_factory hands out a thread-local (scoped) session
+    with session_factory() as session_db:
+        save_searched_games_to_db(session_db, games_info)
+
+# Function to generate an answer using GPT-4o-mini
+# Answer prompt, filled with str.format_map; fields missing from a game render as 'N/A'
+ANSWER_PROMPT_TEMPLATE = """
 You are a game instructor assistant. Use the following game information to answer the user's question.
 
-Game Name: {game_name}
-Description: {game_description}
-Alternate Names: {game_info.get('alternateNames', 'N/A')}
-Subcategory: {game_info.get('subcategory', 'N/A')}
-Level: {game_info.get('level', 'N/A')}
-Players Max: {game_info.get('playersMax', 'N/A')}
-Age Range: {game_info.get('ageRange', 'N/A')}
-Duration: {game_info.get('duration', 'N/A')}
-Equipment Needed: {game_info.get('equipmentNeeded', 'N/A')}
-Objective: {game_info.get('objective', 'N/A')}
-Skills Developed: {game_info.get('skillsDeveloped', 'N/A')}
-Setup Time: {game_info.get('setupTime', 'N/A')}
-Place: {game_info.get('place', 'N/A')}
-Physical Intensity Level: {game_info.get('physicalIntensityLevel', 'N/A')}
-Educational Benefits: {game_info.get('educationalBenefits', 'N/A')}
-Category: {game_info.get('category', 'N/A')}
+Game Name: {gameName}
+Description: {description}
+Alternate Names: {alternateNames}
+Subcategory: {subcategory}
+Level: {level}
+Players Max: {playersMax}
+Age Range: {ageRange}
+Duration: {duration}
+Equipment Needed: {equipmentNeeded}
+Objective: {objective}
+Skills Developed: {skillsDeveloped}
+Setup Time: {setupTime}
+Place: {place}
+Physical Intensity Level: {physicalIntensityLevel}
+Educational Benefits: {educationalBenefits}
+Category: {category}
 
 User's Question: {question}
 
 Answer:
-"""
+""".format_map
+_ANSWER_PROMPT_DEFAULTS = {
+    'gameName': 'Unknown Game',
+    'description': 'No description available.',
+}
+
+def build_answer_prompt(game_info, question):
+    """
+    Builds the answer prompt from the game information and the user's question.
+    """
+    values = defaultdict(lambda: 'N/A', _ANSWER_PROMPT_DEFAULTS)
+    values.update(game_info)
+    values['question'] = question
+    return ANSWER_PROMPT_TEMPLATE(values)
+
+ANSWER_ERROR_MESSAGE = "Sorry, I couldn't generate an answer at this time."
 
+def generate_answer_from_game_info(game_info, question):
+    """
+    Generates an answer based on the game information and the user's question.
+    """
     try:
-        response = call_gpt_4o_mini(prompt)
+        response = call_gpt_4o_mini(build_answer_prompt(game_info, question))
         return response
     except Exception as e:
         st.error(f"🚨 Error generating answer with GPT-4o-mini: {e}")
         st.error(traceback.format_exc())
-        return "Sorry, I couldn't generate an answer at this time."
+        return ANSWER_ERROR_MESSAGE
+
+def open_answer_stream(game_info, question):
+    """
+    Opens a streaming completion for the game information and the user's question.
+    The request is sent, and generation starts, as soon as this returns.
+    Streamed answers bypass the completion cache. Returns None if the request failed.
+    """
+    try:
+        return openai.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "user", "content": build_answer_prompt(game_info, question)}
+            ],
+            max_tokens=500,
+            temperature=0.0,
+            stream=True
+        )
+    except Exception as e:
+        st.error(f"🚨 Error generating answer with GPT-4o-mini: {e}")
+        st.error(traceback.format_exc())
+        return None
+
+def stream_answer_from_game_info(stream):
+    """
+    Yields the text chunks of a stream from open_answer_stream, for `st.write_stream`.
+    """
+    if stream is None:
+        yield ANSWER_ERROR_MESSAGE
+        return
+    try:
+        for chunk in stream:
+            if chunk.choices:
+                yield chunk.choices[0].delta.content or ""
+    except Exception as e:
+        st.error(f"🚨 Error generating answer with GPT-4o-mini: {e}")
+        st.error(traceback.format_exc())
+        yield ANSWER_ERROR_MESSAGE
 
 # Main function to get the answer
-def get_answer(question, user_id, session_db, k=1, hybrid=False, weaviate_client=None):
+def get_answer(question, user_id, session_factory, k=1, hybrid=False, weaviate_client=None, stream=False):
     """
     Main function to get the answer to the question.
     Args:
         question (str): The user's question.
         user_id (int): The user's ID.
-        session_db: SQLAlchemy session for database operations.
+        session_factory: Callable returning a context manager that yields a SQLAlchemy session
+            (e.g. app.session_scope); a session is opened only around each database write.
         k (int): Number of results to return.
         hybrid (bool): Whether to use hybrid search.
         weaviate_client: Weaviate client instance.
+        stream (bool): Return each answer as a text-chunk generator under 'answer_stream'
+            instead of generated text under 'answer'. Every stream is already open and generating.
     Returns:
         dict: Contains 'is_related' (bool), 'message' (str), 'rewritten_question' (str), and 'answers' (list) if applicable.
+            With answers, 'searched_games_saved' is a Future for the background searched-game write;
+            wait on it before inserting rows that reference those games; it re-raises the write's error.
     """
-    # Preprocess the question using query rewriting techniques
-    preprocessed_question = preprocess_query(question)
-
-    # Check if either the original or the rewritten question is game-related
-    is_related_original = check_if_game_related(question)
-    is_related_rewritten = check_if_game_related(preprocessed_question)
-    is_related = is_related_original or is_related_rewritten
+    if is_clearly_game_related(question):
+        # Confidently game-related: search with the question as asked and skip the GPT call
+        is_related, preprocessed_question = True, question
+    else:
+        # Rewrite the question and check it for game relevance in one GPT call
+        is_related, preprocessed_question = analyze_question(question)
 
     if not is_related:
         return {
@@ -227,26 +470,36 @@ def get_answer(question, user_id, session_db, k=1, hybrid=False, weaviate_client
         # Search Weaviate using the preprocessed question
         results = search_weaviate(preprocessed_question, weaviate_client, k=k)
         if results:
+            # Save the searched games in the background first, so the write overlaps the GPT calls
+            searched_games_saved = get_save_pool().submit(
+                _save_searched_games_in_background, session_factory, results
+            )
+            # Generate the answers for all results concurrently using GPT-4o-mini;
+            # streams are opened up front so later answers generate while earlier ones render
+            generated = _run_concurrently(*[
+                (open_answer_stream if stream else generate_answer_from_game_info, result, preprocessed_question)
+                for result in results
+            ])
             answers = []
-            for result in results:
+            for result, output in zip(results, generated):
                 game_id = result.get('gameId')
-                # Generate an answer using GPT-4o-mini
-                answer_text = generate_answer_from_game_info(result, preprocessed_question)
                 answer = {
                     'game_name': result.get('gameName', 'Unknown Game'),
-                    'answer': answer_text,
                     'game_id': game_id,
                     'subcategory': result.get('subcategory', None),
                     'level': result.get('level', None),
                     'category': result.get('category', None),
                 }
-                # Save the searched game to the database
-                save_searched_game_to_db(session_db, result)
+                if stream:
+                    answer['answer_stream'] = stream_answer_from_game_info(output)
+                else:
+                    answer['answer'] = output
                 answers.append(answer)
             return {
                 'is_related': True,
                 'answers': answers,
-                'rewritten_question': preprocessed_question
+                'rewritten_question': preprocessed_question,
+                'searched_games_saved': searched_games_saved
             }
         else:
             return {
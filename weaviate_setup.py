@@ -7,11 +7,14 @@ import re
 from sentence_transformers import SentenceTransformer
 import numpy as np
 import streamlit as st
+from embedding_cache import EmbeddingCache
 
 # Module-level variables to keep track of initialization
 schema_initialized = False
 data_ingested = False
 
+# One client per process; schema setup and ingestion share it
+@st.cache_resource
 def get_weaviate_client():
     WEAVIATE_URL = st.secrets["WEAVIATE"]["URL"]
     WEAVIATE_API_KEY = st.secrets["WEAVIATE"]["API_KEY"]
@@ -24,6 +27,21 @@ def get_weaviate_client():
     )
     return client
 
+# Objects per Weaviate batch request during ingestion
+INGEST_BATCH_SIZE = 100
+# Descriptions per SentenceTransformer forward pass (it length-sorts within the call)
+ENCODE_BATCH_SIZE = 64
+
+def report_batch_errors(results):
+    """
+    Batch callback: prints objects Weaviate rejected, like the per-object insert used to.
+    """
+    for result in results or []:
+        errors = result.get("result", {}).get("errors")
+        if errors:
+            game_name = result.get("properties", {}).get("gameName")
+            print(f"Failed to insert game: {game_name}. Error: {errors}")
+
 def create_schema():
     client = get_weaviate_client()
 
@@ -69,33 +87,53 @@ def ingest_data():
     if count == 0:
         # Initialize Sentence Transformer model
         model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Unchanged descriptions are read from the embedding cache instead of re-encoded
+        embedding_cache = EmbeddingCache('all-MiniLM-L6-v2')
 
         # Read the CSV file
         data = pd.read_csv("data/game-dataset.csv")
 
         # Include your helper functions like extract_duration, parse_players_max, etc.
 
-        # Iterate through each row and create a Weaviate object
-        for _, row in data.iterrows():
-            # Prepare the game data with error handling
-            game_data = {
-                "gameId": str(row['gameId']) if pd.notnull(row['gameId']) else "",
-                "gameName": str(row['gameName']) if pd.notnull(row['gameName']) else "Unknown Game",
-                # ... include all your fields
-            }
-
-            # Vectorize the game description
-            description_vector = model.encode(game_data['description']).tolist()
-
-            # Add the object to Weaviate with the vector
-            try:
-                client.data_object.create(
+        # Fill nulls and stringify column-wise, then turn the rows into plain dicts once
+        data = data.fillna({"gameId": "", "gameName": "Unknown Game", "description": ""})
+        data = data.astype({"gameId": str, "gameName": str, "description": str})
+        records = data[["gameId", "gameName", "description"]].to_dict(orient="records")
+
+        # Pass 1: encode every description in one call so the model can batch and length-sort them
+        descriptions = [record["description"] for record in records]
+        description_vectors = embedding_cache.encode(
+            model,
+            descriptions,
+            batch_size=ENCODE_BATCH_SIZE,
+            convert_to_numpy=True,
+            show_progress_bar=False
+        )
+
+        # Objects are sent in batches of INGEST_BATCH_SIZE instead of one request per game
+        client.batch.configure(
+            batch_size=INGEST_BATCH_SIZE,
+            dynamic=True,
+            num_workers=2,
+            callback=report_batch_errors
+        )
+
+        # Pass 2: create a Weaviate object for each row with its precomputed vector
+        with client.batch as batch:
+            for record, description_vector in zip(records, description_vectors):
+                # Prepare the game data (nulls were filled above)
+                game_data = {
+                    "gameId": record["gameId"],
+                    "gameName": record["gameName"],
+                    # ... include all your fields
+                }
+
+                # Add the object to the batch with the vector
+                batch.add_data_object(
                     data_object=game_data,
                     class_name="Game",
-                    vector=description_vector
+                    vector=description_vector.tolist()
                 )
-            except Exception as e:
-                print(f"Failed to insert game: {game_data['gameName']}. Error: {e}")
 
         st.write("✅ Data ingestion completed.")
     # Do not print anything if data is already ingested